@@ -1,22 +1,62 @@
+import numpy as np
 from statsmodels.stats.power import FTestAnovaPower
+from power_grid import memoized_grid, solve_sample_sizes
 
 def calculate_sample_size(effect_size, alpha=0.05, power=0.8, groups=2.0):
     """
-    Calculate the required sample size for a two-sample t-test.
+    Calculate the required sample size for a one-way ANOVA.
 
     Parameters:
-    effect_size (float): The expected effect size (Cohen's d).
+    effect_size (float): The expected effect size (Cohen's f).
     alpha (float): The significance level (default is 0.05).
     power (float): The desired power of the test (default is 0.8).
-    ratio (float): The ratio of sample sizes between the two groups (default is 1.0).
+    groups (float): The number of groups compared (default is 2).
 
     Returns:
-    int: The required sample size for each group.
+    int: The required number of observations (all groups together).
     """
     analysis = FTestAnovaPower()
     sample_size = analysis.solve_power(effect_size=effect_size, alpha=alpha, power=power, k_groups=groups)
     return int(sample_size) + 1  # Round up to the next whole number
 
-sample_size = calculate_sample_size(effect_size=0.5, groups=4)
+def sample_size_batch(points):
+    """
+    Required sample sizes of many grid points, solved together.
+
+    Parameters:
+    points (DataFrame): effect_size, alpha, power and groups columns.
+
+    Returns:
+    ndarray: Sample size of every point as in calculate_sample_size (NaN where it has to be solved per point).
+    """
+    analysis = FTestAnovaPower()
+    effect_size = points['effect_size'].to_numpy(dtype=float)
+    alpha = points['alpha'].to_numpy(dtype=float)
+    groups = points['groups'].to_numpy(dtype=float)
+    solution = solve_sample_sizes(
+        lambda nobs: analysis.power(effect_size=effect_size, nobs=nobs, alpha=alpha, k_groups=groups),
+        points['power'].to_numpy(dtype=float), low=groups + 1)
+    return np.floor(solution) + 1
+
+def sample_size_grid(effect_sizes, alphas=(0.05,), powers=(0.8,), groups=(2.0,)):
+    """
+    Required sample sizes for every combination of the given values.
+
+    Points solved before are read from the power cache instead of solved again,
+    the new ones are solved together (sample_size_batch).
+
+    Returns:
+    DataFrame: effect_size, alpha, power, groups and sample_size columns.
+    """
+    grid = {'effect_size': list(effect_sizes), 'alpha': list(alphas), 'power': list(powers), 'groups': list(groups)}
+    return memoized_grid('anova', calculate_sample_size, grid, calculate_batch=sample_size_batch)
+
+
+if __name__ == "__main__":
+    sample_size = calculate_sample_size(effect_size=0.5, groups=4)
+
+    print(f"Required total sample size: {sample_size}")
 
-print(f"Required sample size per group: {sample_size}")
\ No newline at end of file
+    # Grid for planning: effect size (Cohen's f) x number of groups
+    grid = sample_size_grid(effect_sizes=[0.1, 0.25, 0.4, 0.5], groups=[2, 3, 4])
+    print(grid.pivot(index='effect_size', columns='groups', values='sample_size'))
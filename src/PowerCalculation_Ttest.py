@@ -1,4 +1,6 @@
+import numpy as np
 from statsmodels.stats.power import TTestPower
+from power_grid import memoized_grid, solve_sample_sizes
 
 def calculate_sample_size(effect_size, alpha=0.05, power=0.8, ratio=1.0, type='two-sided'):
     """
@@ -17,11 +19,52 @@ def calculate_sample_size(effect_size, alpha=0.05, power=0.8, ratio=1.0, type='t
     sample_size = analysis.solve_power(effect_size=effect_size, alpha=alpha, power=power, alternative=type)
     return int(sample_size) + 1  # Round up to the next whole number
 
-# Cohen's d effect size of 0.5 (medium effect)
-# Gives Cohen's f of 0.25 (https://www.escal.site/)
-# Cohen's f is used for the TTestPower
-sample_size = calculate_sample_size(0.5)
+def sample_size_batch(points):
+    """
+    Required sample sizes of many grid points, solved together.
+
+    Parameters:
+    points (DataFrame): effect_size, alpha, power and type columns.
+
+    Returns:
+    ndarray: Sample size of every point as in calculate_sample_size (NaN where it has to be solved per point).
+    """
+    analysis = TTestPower()
+    sizes = np.full(len(points), np.nan)
+    for alternative, group in points.groupby('type'):
+        rows = points.index.get_indexer(group.index)
+        effect_size = group['effect_size'].to_numpy(dtype=float)
+        alpha = group['alpha'].to_numpy(dtype=float)
+        solution = solve_sample_sizes(
+            lambda nobs: analysis.power(effect_size=effect_size, nobs=nobs, alpha=alpha, alternative=alternative),
+            group['power'].to_numpy(dtype=float), low=2.0)
+        sizes[rows] = np.floor(solution) + 1
+    return sizes
+
+def sample_size_grid(effect_sizes, alphas=(0.05,), powers=(0.8,), types=('two-sided',)):
+    """
+    Required sample sizes for every combination of the given values.
+
+    Points solved before are read from the power cache instead of solved again,
+    the new ones are solved together (sample_size_batch).
+
+    Returns:
+    DataFrame: effect_size, alpha, power, type and sample_size columns.
+    """
+    grid = {'effect_size': list(effect_sizes), 'alpha': list(alphas), 'power': list(powers), 'type': list(types)}
+    return memoized_grid('ttest', calculate_sample_size, grid, calculate_batch=sample_size_batch)
+
+
+if __name__ == "__main__":
+    # Cohen's d effect size of 0.5 (medium effect)
+    # Gives Cohen's f of 0.25 (https://www.escal.site/)
+    # Cohen's f is used for the TTestPower
+    sample_size = calculate_sample_size(0.5)
+
+    # Cohen's d effect size of 0.5 (medium effect) (Cohen's f = 0.25) -> 128
+    # Cohen's d effect size of 1 (large effect) (Cohen's f = 0.5) -> 34
+    print(f"Required sample size per group: {sample_size}")
 
-# Cohen's d effect size of 0.5 (medium effect) (Cohen's f = 0.25) -> 128
-# Cohen's d effect size of 1 (large effect) (Cohen's f = 0.5) -> 34
-print(f"Required sample size per group: {sample_size}")
\ No newline at end of file
+    # Grid for planning: effect size x power
+    grid = sample_size_grid(effect_sizes=[0.3, 0.4, 0.5, 0.6, 0.8, 1.0], powers=[0.8, 0.9])
+    print(grid.pivot(index='effect_size', columns='power', values='sample_size'))
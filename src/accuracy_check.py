@@ -1,14 +1,13 @@
+import os
 import pandas as pd
+from scoring import score_trials
 
 # --- 1. Load a single CSV file ---
-file = "data\experiment_07c0d72f_20251029_200243.csv"  # change to your filename
+file = os.path.join("data", "experiment_07c0d72f_20251029_200243.csv")  # change to your filename
 df = pd.read_csv(file)
 
 # compute 'is_correct' column
-df["is_correct"] = (
-    df["eng"].astype(str).str.strip().str.lower()
-    == df["answer"].astype(str).str.strip().str.lower()
-)   
+df["is_correct"] = score_trials(df)["correct"].astype(bool)
 
 # compute accuracy by condition
 acc_by_cond = df.groupby("condition")["is_correct"].mean()
@@ -0,0 +1,343 @@
+import glob
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from scoring import score_trials
+
+# Bump when the summary layout or the scoring changes
+SUMMARY_CACHE_VERSION = 3
+SUMMARY_CACHE_PATH = os.path.join("data", "summary_cache.pkl")
+TRIALS_CACHE_VERSION = 1
+TRIALS_CACHE_PATH = os.path.join("data", "trials_cache.pkl")
+
+# Column order and dtypes of a trial row (current session layout)
+TRIAL_COLUMNS = ['id', 'word_id', 'ice', 'eng', 'answer', 'test_id', 'condition', 'knows_icelandic', 'youtube_usage']
+TRIAL_DTYPES = {
+    'id': str,
+    'word_id': 'int64',
+    'ice': str,
+    'eng': str,
+    'answer': str,
+    'test_id': 'int64',
+    'condition': str,
+    'knows_icelandic': str,
+    'youtube_usage': str,
+}
+# Legacy layout (October 2025 pilots): one row per word with both answers side by side
+LEGACY_DTYPES = {'id': str, 'word_id': 'int64', 'ice': str, 'eng': str, 'answ_1': str, 'answ_2': str}
+CATEGORICAL_COLUMNS = ['id', 'condition', 'knows_icelandic', 'youtube_usage']
+
+# One row per (session, condition, test)
+SUMMARY_COLUMNS = ['id', 'condition', 'test_id', 'correct_count', 'total', 'accuracy',
+                   'youtube_usage', 'knows_icelandic']
+
+
+def detect_schema(path):
+    """Return 'current', 'legacy' or 'unknown' from a session file's header line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline().strip().split(',')
+    if 'test_id' in header and 'answer' in header:
+        return 'current'
+    if 'answ_1' in header and 'answ_2' in header:
+        return 'legacy'
+    return 'unknown'
+
+
+def read_legacy_file(path):
+    """Normalize a legacy answ_1/answ_2 file to the current layout (no condition known)"""
+    legacy = pd.read_csv(path, dtype=LEGACY_DTYPES)
+    base = legacy[['id', 'word_id', 'ice', 'eng']]
+    df = pd.concat([
+        base.assign(answer=legacy['answ_1'], test_id=0),
+        base.assign(answer=legacy['answ_2'], test_id=1),
+    ], ignore_index=True)
+    for column in ['condition', 'knows_icelandic', 'youtube_usage']:
+        df[column] = pd.Series(pd.NA, index=df.index, dtype=object)
+    return df[TRIAL_COLUMNS]
+
+
+def read_session_file(path):
+    """Read one session file into the current trial layout, whatever its schema"""
+    schema = detect_schema(path)
+    if schema == 'current':
+        return pd.read_csv(path, dtype=TRIAL_DTYPES, usecols=TRIAL_COLUMNS)[TRIAL_COLUMNS]
+    if schema == 'legacy':
+        return read_legacy_file(path)
+    print(f"Skipping {path}: unknown file layout")
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in TRIAL_DTYPES.items()})
+
+
+def read_files_parallel(reader, paths, workers=None):
+    """Apply reader to every path on a thread pool, keeping the order of paths"""
+    if len(paths) <= 1:
+        return [reader(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        return list(pool.map(reader, paths))
+
+
+def load_trials(data_dir="data", workers=None):
+    """
+    Load every session file in data_dir into one typed trial frame
+
+    Files are read in parallel; legacy answ_1/answ_2 files are normalized to
+    the current layout with an empty condition. id, condition,
+    knows_icelandic and youtube_usage come back as categorical columns.
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, "*.csv")))
+    frames = read_files_parallel(read_session_file, paths, workers)
+    if not frames:
+        df = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in TRIAL_DTYPES.items()})
+    else:
+        df = pd.concat(frames, ignore_index=True)
+    return df.astype({column: 'category' for column in CATEGORICAL_COLUMNS})
+
+
+def summarize_trials(scored):
+    """
+    Collapse scored trial rows to one row per (id, condition, test_id)
+
+    Rows without a condition/test_id (the legacy answ_1/answ_2 layout) are
+    left out, exactly like the grouping in the analysis script.
+    """
+    if scored.empty or not {'condition', 'test_id'}.issubset(scored.columns):
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+
+    summary = (
+        scored.groupby(['id', 'condition', 'test_id'], sort=False, observed=True)
+              .agg(
+                  correct_count=('correct', 'sum'),
+                  total=('correct', 'count'),
+                  youtube_usage=('youtube_usage', 'first'),
+                  knows_icelandic=('knows_icelandic', 'first')
+              )
+              .reset_index()
+    )
+    summary['test_id'] = summary['test_id'].astype(int)
+    summary['accuracy'] = summary['correct_count'] / summary['total']
+    for column in CATEGORICAL_COLUMNS:
+        if isinstance(summary[column].dtype, pd.CategoricalDtype):
+            summary[column] = summary[column].astype(object)
+    return summary[SUMMARY_COLUMNS]
+
+
+def session_index(session_summary):
+    """
+    Compact per-session index derived from the summary rows
+
+    The crossover order is read from which condition each session had in
+    test 0 and test 1 ('PN' = personalized first). Sessions without both
+    tests get no order.
+
+    Returns:
+        DataFrame indexed by id with order, first_condition, youtube_usage
+        and knows_icelandic columns
+    """
+    by_test = session_summary.pivot_table(index='id', columns='test_id', values='condition',
+                                          aggfunc='first', observed=True)
+    first = by_test[0] if 0 in by_test.columns else pd.Series(index=by_test.index, dtype=object)
+    second = by_test[1] if 1 in by_test.columns else pd.Series(index=by_test.index, dtype=object)
+
+    demographics = session_summary.groupby('id', sort=False)[['youtube_usage', 'knows_icelandic']].first()
+    index = pd.DataFrame({
+        'order': first + second,  # NaN when a test is missing
+        'first_condition': first,
+    })
+    return index.join(demographics)
+
+
+def add_test_order_columns(results):
+    """
+    Add first/second test accuracies to the per-session results, vectorized
+
+    With order 'PN' the first test was personalized, so accuracy_first is
+    accuracy_P; with 'NP' it is accuracy_N. Also adds the condition of each
+    test and the paired difference diff_PN = accuracy_P - accuracy_N.
+    """
+    is_pn = (results['Condition'] == 'PN').to_numpy()
+    return results.assign(
+        accuracy_first=np.where(is_pn, results['accuracy_P'], results['accuracy_N']),
+        accuracy_second=np.where(is_pn, results['accuracy_N'], results['accuracy_P']),
+        condition_first=np.where(is_pn, 'P', 'N'),
+        condition_second=np.where(is_pn, 'N', 'P'),
+        diff_PN=results['accuracy_P'] - results['accuracy_N']
+    )
+
+
+def win_tie_loss(a, b):
+    """Number of pairs with a > b, b > a and a == b (pairs with a missing value are skipped)"""
+    diffs = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+    signs = np.sign(diffs[~np.isnan(diffs)]).astype(int)
+    losses, ties, wins = np.bincount(signs + 1, minlength=3)[:3]
+    return int(wins), int(losses), int(ties)
+
+
+SUBGROUP_TABLE_COLUMNS = ['group', 'level', 'n', 'mean_N', 'mean_P', 'mean_diff', 'median_diff',
+                          'wins_P', 'wins_N', 'ties', 'wins_first', 'wins_second', 'ties_tests',
+                          'wilcoxon_stat', 'wilcoxon_p']
+
+
+def _signed_rank(diffs):
+    """Wilcoxon signed-rank (statistic, p) of paired differences, NaN without non-zero differences"""
+    from scipy.stats import wilcoxon
+
+    diffs = diffs.dropna()
+    if not (diffs != 0).any():
+        return np.nan, np.nan
+    result = wilcoxon(diffs)
+    return float(result.statistic), float(result.pvalue)
+
+
+def _subgroup_rows(sessions, keys, group):
+    """Aggregated subgroup_table rows of one grouping spec, the levels labelled 'a / b'"""
+    grouped = sessions.groupby(keys, sort=False)
+    table = grouped.agg(
+        n=('diff_PN', 'size'),
+        mean_N=('accuracy_N', 'mean'),
+        mean_P=('accuracy_P', 'mean'),
+        mean_diff=('diff_PN', 'mean'),
+        median_diff=('diff_PN', 'median'),
+        wins_P=('wins_P', 'sum'),
+        wins_N=('wins_N', 'sum'),
+        ties=('ties', 'sum'),
+        wins_first=('wins_first', 'sum'),
+        wins_second=('wins_second', 'sum'),
+        ties_tests=('ties_tests', 'sum'),
+    )
+    tests = grouped['diff_PN'].agg(_signed_rank)
+    table[['wilcoxon_stat', 'wilcoxon_p']] = pd.DataFrame(tests.tolist(), index=tests.index)
+
+    levels = table.index.to_frame(index=False).astype(str)
+    level = levels.iloc[:, 0].str.cat([levels[column] for column in levels.columns[1:]], sep=' / ')
+    return table.reset_index(drop=True).assign(group=group, level=level)
+
+
+def subgroup_table(results, by=('youtube_usage', 'knows_icelandic', 'Condition')):
+    """
+    Counts, win/tie/loss and Wilcoxon tests for every subgroup, one grouped pass per spec
+
+    Args:
+        results: Per-session results with the test order columns
+            (add_test_order_columns) and the session attributes
+        by: Grouping specs; a column name groups by its levels, a tuple of
+            column names by their combinations (e.g. ('youtube_usage', 'Condition'))
+
+    Returns:
+        Tidy DataFrame with SUBGROUP_TABLE_COLUMNS: an 'All' row and one row
+        per level of every spec. wins_P/wins_N/ties compare the conditions,
+        wins_first/wins_second/ties_tests the first and second test, and the
+        Wilcoxon test is on accuracy_P - accuracy_N
+    """
+    condition_sign = np.sign(results['diff_PN'])
+    test_sign = np.sign(results['accuracy_first'] - results['accuracy_second'])
+    sessions = pd.DataFrame({
+        'accuracy_N': results['accuracy_N'], 'accuracy_P': results['accuracy_P'], 'diff_PN': results['diff_PN'],
+        'wins_P': condition_sign > 0, 'wins_N': condition_sign < 0, 'ties': condition_sign == 0,
+        'wins_first': test_sign > 0, 'wins_second': test_sign < 0, 'ties_tests': test_sign == 0,
+    })
+
+    # One grouped pass per spec on its key columns; only the aggregated tables are stacked
+    tables = [_subgroup_rows(sessions, np.zeros(len(sessions), dtype=int), 'All').assign(level='All')]
+    for spec in by:
+        columns = [spec] if isinstance(spec, str) else list(spec)
+        keys = [results[column].astype(str) for column in columns]
+        tables.append(_subgroup_rows(sessions, keys, ' x '.join(columns)))
+    table = pd.concat(tables, ignore_index=True)
+
+    # Specs in the order given, levels sorted within each spec
+    spec_order = {name: i for i, name in enumerate(table['group'].unique())}
+    table = table.sort_values(
+        ['group', 'level'], key=lambda column: column.map(spec_order) if column.name == 'group' else column)
+    return table[SUBGROUP_TABLE_COLUMNS].reset_index(drop=True)
+
+
+def summarize_file(path, max_edits=0):
+    """Read and score one session CSV and return its summary rows"""
+    return summarize_trials(score_trials(read_session_file(path), max_edits=max_edits))
+
+
+def _load_files_cached(data_dir, cache_path, version, max_edits, parse, label):
+    """
+    parse() of every CSV in data_dir, cached per file by mtime and size
+
+    Only new or changed files are parsed (in parallel), deleted files drop
+    out of the cache and a different version or max_edits rebuilds it.
+
+    Returns:
+        List of the parsed frames, in file order
+    """
+    cache = {'version': version, 'max_edits': max_edits, 'files': {}}
+    try:
+        with open(cache_path, 'rb') as f:
+            stored = pickle.load(f)
+        if stored.get('version') == version and stored.get('max_edits') == max_edits:
+            cache = stored
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    files = {}
+    changed = []
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        stat = os.stat(path)
+        entry = cache['files'].get(path)
+        if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'frame': None}
+            changed.append(path)
+        files[path] = entry
+
+    # Parse the new/changed files in parallel
+    parsed_frames = read_files_parallel(parse, changed)
+    for path, frame in zip(changed, parsed_frames):
+        files[path]['frame'] = frame
+    parsed = len(changed)
+
+    if parsed or len(files) != len(cache['files']):
+        cache['files'] = files
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Could not write {label} cache {cache_path}: {e}")
+    print(f"{label}: {len(files)} files, {parsed} parsed, {len(files) - parsed} from cache")
+
+    return [entry['frame'] for entry in files.values()]
+
+
+def load_session_summaries(data_dir="data", max_edits=0, cache_path=SUMMARY_CACHE_PATH):
+    """
+    Per-session summaries of every CSV in data_dir, parsing only new or changed files
+
+    Each file's summary is cached under its path together with its mtime and
+    size; a file is only read again when one of those changes. Deleted files
+    drop out of the cache. Changing max_edits rebuilds the whole cache.
+
+    Returns:
+        DataFrame with SUMMARY_COLUMNS for all sessions
+    """
+    frames = _load_files_cached(data_dir, cache_path, SUMMARY_CACHE_VERSION, max_edits,
+                                lambda path: summarize_file(path, max_edits), "Session summaries")
+    summaries = [summary for summary in frames if not summary.empty]
+    if not summaries:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    return pd.concat(summaries, ignore_index=True)
+
+
+def load_scored_trials(data_dir="data", max_edits=0, cache_path=TRIALS_CACHE_PATH):
+    """
+    Scored trial rows of every CSV in data_dir, parsing only new or changed files
+
+    Same per-file cache as load_session_summaries, holding the scored rows.
+
+    Returns:
+        score_trials output for all sessions, with the CATEGORICAL_COLUMNS as categoricals
+    """
+    frames = _load_files_cached(data_dir, cache_path, TRIALS_CACHE_VERSION, max_edits,
+                                lambda path: score_trials(read_session_file(path), max_edits=max_edits),
+                                "Scored trials")
+    if not frames:
+        return score_trials(load_trials(data_dir), max_edits=max_edits)
+    trials = pd.concat(frames, ignore_index=True)
+    return trials.astype({column: 'category' for column in CATEGORICAL_COLUMNS})
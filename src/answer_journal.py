@@ -0,0 +1,145 @@
+import csv
+import os
+from datetime import datetime
+
+
+class AnswerJournal:
+    """Append-only log of answer changes for one experiment session.
+
+    Every keystroke that changes an answer is appended as one line to a
+    journal file next to the session CSV, so saving at the end of a test is
+    just a flush instead of rewriting the CSV. `compact()` replays the
+    journal onto the session CSV and produces the usual wide format
+    (one row per word, answer column filled in, 'none' for unanswered words).
+    """
+
+    HEADER = ['event', 'test_id', 'word_id', 'answer', 'timestamp']
+
+    def __init__(self, csv_path):
+        """
+        Open (or create) the journal belonging to a session CSV
+
+        Args:
+            csv_path: Path to the session CSV created by ExperimentApp
+        """
+        self.csv_path = csv_path
+        self.journal_path = self.journal_path_for(csv_path)
+        self.last_answers = {}  # (test_id, word_id) -> last answer written
+
+        is_new = not os.path.exists(self.journal_path)
+        self.file = open(self.journal_path, 'a', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if is_new:
+            self.writer.writerow(self.HEADER)
+            self.file.flush()
+
+    @staticmethod
+    def journal_path_for(csv_path):
+        """Journal file that belongs to a session CSV (not *.csv, so analysis globs skip it)"""
+        return os.path.splitext(csv_path)[0] + '.journal'
+
+    def record(self, test_id, word_id, answer):
+        """Append an answer change; repeated identical answers are not written again"""
+        key = (int(test_id), int(word_id))
+        if self.last_answers.get(key) == answer:
+            return
+        self.last_answers[key] = answer
+        self.writer.writerow(['answer', key[0], key[1], answer, datetime.now().isoformat()])
+        self.file.flush()
+
+    def mark_finished(self, test_id):
+        """Record that a test is over, so its unanswered words count as 'none'"""
+        self.writer.writerow(['finish', int(test_id), '', '', datetime.now().isoformat()])
+        self.flush()
+
+    def flush(self):
+        """Push buffered journal lines to disk (constant time, independent of session size)"""
+        if self.file.closed:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """Flush and close the journal file"""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    @classmethod
+    def replay(cls, journal_path):
+        """
+        Read a journal back
+
+        Returns:
+            (answers, finished) where answers maps (test_id, word_id) to the
+            latest answer and finished is the set of completed test_ids
+        """
+        answers = {}
+        finished = set()
+        if not os.path.exists(journal_path):
+            return answers, finished
+
+        with open(journal_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    if row['event'] == 'answer':
+                        answers[(int(row['test_id']), int(row['word_id']))] = row['answer']
+                    elif row['event'] == 'finish':
+                        finished.add(int(row['test_id']))
+                except (KeyError, TypeError, ValueError):
+                    # A line cut short by a crash - everything before it is still valid
+                    continue
+        return answers, finished
+
+    def compact(self):
+        """Write the journaled answers into the session CSV (current wide format)"""
+        self.flush()
+        return compact_session(self.csv_path, self.journal_path)
+
+
+def compact_session(csv_path, journal_path=None):
+    """
+    Replay a session journal onto its CSV file
+
+    Args:
+        csv_path: Session CSV with one row per (test_id, word_id)
+        journal_path: Journal to replay (defaults to the one next to csv_path)
+
+    Returns:
+        Path of the updated CSV, or None if there was nothing to compact
+    """
+    import pandas as pd
+
+    if journal_path is None:
+        journal_path = AnswerJournal.journal_path_for(csv_path)
+
+    answers, finished = AnswerJournal.replay(journal_path)
+    if not answers and not finished:
+        return None
+
+    df = pd.read_csv(csv_path)
+    df['answer'] = df['answer'].astype(object)
+
+    keys = pd.MultiIndex.from_arrays([df['test_id'].astype(int), df['word_id'].astype(int)])
+    has_answer = keys.isin(list(answers.keys()))
+    df.loc[has_answer, 'answer'] = [answers[key] for key in keys[has_answer]]
+    # Unanswered words of finished tests are stored as 'none'
+    unanswered = df['test_id'].astype(int).isin(finished).to_numpy() & ~has_answer
+    df.loc[unanswered, 'answer'] = 'none'
+
+    # Write to a temp file first so a crash never leaves a half-written CSV
+    tmp_path = csv_path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, csv_path)
+    print(f"✓ Compacted {len(answers)} journaled answers into {csv_path}")
+    return csv_path
+
+
+if __name__ == "__main__":
+    # Compact every journal left in data/ (e.g. after a crashed session)
+    data_dir = "data"
+    for name in sorted(os.listdir(data_dir)):
+        if name.endswith('.journal'):
+            session_csv = os.path.join(data_dir, name[:-len('.journal')] + '.csv')
+            if os.path.exists(session_csv):
+                compact_session(session_csv)
@@ -0,0 +1,109 @@
+"""
+Click-through check of the experiment app
+
+Drives one complete session through the buttons of the screens, as a
+participant (with the testing skip buttons) would: welcome, information,
+memorizing, break, get ready, test, break, memorizing, break, get ready,
+test and results. After every click it checks that the expected screen is
+shown, and that the test screens were built during the get-ready countdown.
+The session file is written to a temporary directory, not to data/.
+
+Run from the project root:  python src/flow_check.py
+(needs a display, like the experiment itself; e.g. xvfb-run python src/flow_check.py)
+"""
+import os
+import sys
+import tempfile
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# (screen the click is made on, widget class, text of the widget, screen expected afterwards)
+FLOW = [
+    ('welcome', tk.Radiobutton, "No", 'welcome'),
+    ('welcome', tk.Radiobutton, "0-15 minutes", 'welcome'),
+    ('welcome', tk.Button, "Personalized", 'information'),
+    ('information', tk.Button, "Next", 'first_memorizing'),
+    ('first_memorizing', tk.Button, "Next (Testing)", 'first_break'),
+    ('first_break', tk.Button, "Skip Break (Testing)", 'first_get_ready'),
+    ('first_get_ready', tk.Button, "Skip Break", 'test_0'),
+    ('test_0', tk.Button, "Finish Test", 'intermediate_break'),
+    ('intermediate_break', tk.Button, "Skip Break", 'second_memorizing'),
+    ('second_memorizing', tk.Button, "Next (Testing)", 'second_break'),
+    ('second_break', tk.Button, "Skip Break (Testing)", 'second_get_ready'),
+    ('second_get_ready', tk.Button, "Skip Break", 'test_1'),
+    ('test_1', tk.Button, "Finish Test", 'final_completion'),
+]
+
+# Test screen that has to exist (built ahead) while a get-ready screen is shown
+PREBUILT = {'first_get_ready': 'test_0', 'second_get_ready': 'test_1'}
+
+
+def find_widget(parent, widget_class, text):
+    """First widget of the class with the given text below parent (depth first)"""
+    for child in parent.winfo_children():
+        if isinstance(child, widget_class) and child.cget('text') == text:
+            return child
+        found = find_widget(child, widget_class, text)
+        if found is not None:
+            return found
+    return None
+
+
+def run_flow():
+    """Run FLOW on a fresh app and return the list of failures"""
+    import main
+
+    root = tk.Tk()
+    app = main.ExperimentApp(root)
+    root.update()
+
+    failures = []
+    for screen, widget_class, text, expected in FLOW:
+        if app.screens.current != screen:
+            failures.append(f"expected screen {screen}, found {app.screens.current}")
+            break
+        if screen in PREBUILT and PREBUILT[screen] not in app.screens.screens:
+            failures.append(f"{PREBUILT[screen]} was not built during {screen}")
+
+        widget = find_widget(app.screens.screens[screen][0], widget_class, text)
+        if widget is None:
+            failures.append(f"no {widget_class.__name__} '{text}' on {screen}")
+            break
+        print(f"{screen}: {text}")
+        widget.invoke()
+        root.update()
+        if app.screens.current != expected:
+            failures.append(f"'{text}' on {screen} went to {app.screens.current} instead of {expected}")
+            break
+
+    root.destroy()
+    return failures
+
+
+def main():
+    project_root = os.getcwd()
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        print(f"Could not start the app: {e}")
+        return 2
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The app reads word_pairs/ and writes data/ relative to the working directory
+        os.symlink(os.path.join(project_root, 'word_pairs'), os.path.join(workdir, 'word_pairs'))
+        os.chdir(workdir)
+        try:
+            failures = run_flow()
+        finally:
+            os.chdir(project_root)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Group-sequential interim analysis of the P - N difference
+
+Participants come in waves. Testing the accumulated sessions after every
+wave at the nominal 5% inflates the type-I error, so every look is tested
+against an alpha-spending boundary (Lan-DeMets, O'Brien-Fleming or Pocock
+type) at its information fraction n / PLANNED_SESSIONS. The test statistic
+is the paired Wilcoxon signed-rank test of the analysis, as a signed z.
+
+The running aggregates of the streaming analysis and the ingested files
+are kept in data/interim_state.pkl, so a new batch of session files costs
+only its own ingestion. Files not seen before are grouped into waves by
+the timestamp in their name (gaps of at least WAVE_GAP between sessions)
+and every wave is one look.
+
+Run from the project root:  python src/interim_analysis.py [planned_sessions] [pocock]
+"""
+import glob
+import math
+import os
+import pickle
+import re
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import brentq
+from scipy.stats import norm
+
+from streaming_analysis import CHUNK_ROWS, SubgroupAggregate, ingest_file
+
+# Bump when the stored aggregates change
+INTERIM_STATE_VERSION = 1
+INTERIM_STATE_PATH = os.path.join("data", "interim_state.pkl")
+
+# Maximum number of complete sessions of the study; fix it (e.g. from
+# src/power_calibration.py) before the first look and do not change it afterwards
+PLANNED_SESSIONS = 60
+INTERIM_ALPHA = 0.05
+
+# Sessions at least this far apart belong to different waves
+WAVE_GAP = pd.Timedelta(days=2)
+
+# Points of the numerical integration grid of the boundary recursion
+BOUNDARY_GRID_POINTS = 2001
+# Boundaries beyond this z spend (numerically) no alpha
+MAX_BOUNDARY_Z = 8.0
+
+INTERIM_COLUMNS = ['look', 'first_session', 'last_session', 'n', 'information', 'alpha_spent',
+                   'boundary_z', 'boundary_p', 'z', 'p_value', 'decision']
+
+SESSION_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})\.csv$')
+
+
+def obrien_fleming_spending(t, alpha=INTERIM_ALPHA):
+    """
+    Cumulative two-sided alpha spent at information fraction t, O'Brien-Fleming type
+
+    The one-sided Lan-DeMets function at alpha / 2 for each tail.
+    """
+    t = np.clip(t, 1e-12, 1.0)
+    return 4 * norm.sf(norm.isf(alpha / 4) / np.sqrt(t))
+
+
+def pocock_spending(t, alpha=INTERIM_ALPHA):
+    """Cumulative two-sided alpha spent at information fraction t, Pocock type"""
+    return alpha * np.log1p((math.e - 1) * np.clip(t, 0.0, 1.0))
+
+
+SPENDING_FUNCTIONS = {
+    'obrien-fleming': obrien_fleming_spending,
+    'pocock': pocock_spending,
+}
+
+
+def group_sequential_boundaries(fractions, alpha=INTERIM_ALPHA, spending='obrien-fleming'):
+    """
+    Two-sided z boundaries for looks at the given information fractions
+
+    The boundary of look k spends alpha(t_k) - alpha(t_k-1): the probability
+    under H0 of crossing it without having crossed an earlier one. The joint
+    distribution of the z statistics comes from the score process
+    S(t) = Z(t) sqrt(t), which has independent normal increments; its
+    density on the continuation region is carried from look to look by
+    numerical integration. Only past looks enter a boundary, so the looks
+    need not be equally spaced or planned in advance.
+
+    Returns:
+        (boundaries, spent): z boundary and cumulative alpha of every look
+    """
+    fractions = np.minimum(np.asarray(fractions, dtype=float), 1.0)
+    spent = SPENDING_FUNCTIONS[spending](fractions, alpha)
+    spent[fractions >= 1.0] = alpha
+    spent = np.maximum.accumulate(spent)
+
+    boundaries = np.empty(len(fractions))
+    grid = mass = None
+    previous_t = previous_spent = 0.0
+    for k, (t, cumulative) in enumerate(zip(fractions, spent)):
+        target = cumulative - previous_spent
+        if k == 0:
+            c = norm.isf(target / 2) if target > 0 else math.inf
+        else:
+            sd = math.sqrt(t - previous_t)
+
+            def exit_probability(c):
+                return mass @ (norm.sf((c * math.sqrt(t) - grid) / sd) + norm.cdf((-c * math.sqrt(t) - grid) / sd))
+
+            if target <= 0 or exit_probability(MAX_BOUNDARY_Z) >= target:
+                c = math.inf if target <= 0 else MAX_BOUNDARY_Z
+            else:
+                c = brentq(lambda c: exit_probability(c) - target, 0.0, MAX_BOUNDARY_Z, xtol=1e-8)
+        boundaries[k] = c
+
+        # Density of S(t) on the continuation region |Z| < c, as trapezoid masses
+        half_width = min(c, MAX_BOUNDARY_Z) * math.sqrt(t)
+        new_grid = np.linspace(-half_width, half_width, BOUNDARY_GRID_POINTS)
+        if k == 0:
+            density = norm.pdf(new_grid / math.sqrt(t)) / math.sqrt(t)
+        else:
+            density = norm.pdf((new_grid[:, np.newaxis] - grid) / sd) @ mass / sd
+        weights = np.full(BOUNDARY_GRID_POINTS, new_grid[1] - new_grid[0])
+        weights[[0, -1]] /= 2
+        grid, mass = new_grid, density * weights
+        previous_t, previous_spent = t, cumulative
+    return boundaries, spent
+
+
+def session_timestamp(path):
+    """Start time of a session file: the timestamp in its name, else its modification time"""
+    match = SESSION_TIMESTAMP.search(os.path.basename(path))
+    if match:
+        return pd.to_datetime(match.group(1), format="%Y%m%d_%H%M%S")
+    return pd.Timestamp.fromtimestamp(os.path.getmtime(path))
+
+
+def assign_waves(paths, gap=WAVE_GAP):
+    """Group session files into waves of recruitment, in time order"""
+    timed = sorted((session_timestamp(path), path) for path in paths)
+    waves = []
+    for timestamp, path in timed:
+        if not waves or timestamp - waves[-1][-1][0] >= gap:
+            waves.append([])
+        waves[-1].append((timestamp, path))
+    return waves
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _new_state(max_edits):
+    return {'version': INTERIM_STATE_VERSION, 'max_edits': max_edits, 'files': {},
+            'aggregate': SubgroupAggregate(), 'looks': []}
+
+
+def _load_state(state_path, max_edits):
+    """Stored state, or a new one if it is missing or was scored with another max_edits"""
+    try:
+        with open(state_path, 'rb') as f:
+            state = pickle.load(f)
+        if state.get('version') == INTERIM_STATE_VERSION and state.get('max_edits') == max_edits:
+            return state
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    return _new_state(max_edits)
+
+
+def _signed_z(aggregate):
+    """Signed z of the two-sided Wilcoxon test of P - N (positive: P better) and its p-value"""
+    _, p_value = aggregate.diff_sketch.signed_rank_test()
+    if math.isnan(p_value):
+        return 0.0, 1.0
+    return math.copysign(norm.isf(p_value / 2), aggregate.diff.mean), p_value
+
+
+def interim_analysis(data_dir="data", planned_sessions=PLANNED_SESSIONS, alpha=INTERIM_ALPHA,
+                     spending='obrien-fleming', max_edits=0, state_path=INTERIM_STATE_PATH,
+                     chunk_rows=CHUNK_ROWS):
+    """
+    Add the new session files as looks and test every look against its boundary
+
+    Args:
+        data_dir: Directory with the session CSV files
+        planned_sessions: Maximum number of complete sessions (information fraction 1)
+        alpha: Overall two-sided significance level
+        spending: 'obrien-fleming' or 'pocock'
+        max_edits: Accept typos within this many edits as correct (0 = exact only)
+        state_path: Pickle with the running aggregates and the looks so far
+        chunk_rows: Trial rows read and scored at a time
+
+    Returns:
+        (looks, decision): DataFrame with INTERIM_COLUMNS, one row per look,
+        and the decision of the first look that stopped (else of the last look)
+    """
+    state = _load_state(state_path, max_edits)
+    paths = sorted(glob.glob(os.path.join(data_dir, "*.csv")))
+    signatures = {path: _file_signature(path) for path in paths}
+    if any(signatures.get(path) != signature for path, signature in state['files'].items()):
+        # A file already in the aggregates changed or disappeared; they cannot be undone
+        print("Session files changed since the last look: rebuilding the interim state")
+        state = _new_state(max_edits)
+
+    new_paths = [path for path in paths if path not in state['files']]
+    for wave in assign_waves(new_paths):
+        n_before = state['aggregate'].diff.count
+        for _, path in wave:
+            for accuracy, _ in ingest_file(path, {}, chunk_rows, max_edits):
+                state['aggregate'].add(accuracy['N'], accuracy['P'])
+            state['files'][path] = signatures[path]
+        if state['aggregate'].diff.count > n_before:
+            z, p_value = _signed_z(state['aggregate'])
+            state['looks'].append({'first_session': wave[0][0], 'last_session': wave[-1][0],
+                                   'n': state['aggregate'].diff.count, 'z': z, 'p_value': p_value})
+    print(f"Interim analysis: {len(new_paths)} new files, {len(state['files'])} ingested, "
+          f"{len(state['looks'])} looks")
+
+    if new_paths:
+        try:
+            with open(state_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Could not write interim state {state_path}: {e}")
+
+    looks = pd.DataFrame(state['looks'], columns=['first_session', 'last_session', 'n', 'z', 'p_value'])
+    if looks.empty:
+        return pd.DataFrame(columns=INTERIM_COLUMNS), "continue"
+
+    looks.insert(0, 'look', np.arange(1, len(looks) + 1))
+    looks['information'] = np.minimum(looks['n'] / planned_sessions, 1.0)
+    boundaries, spent = group_sequential_boundaries(looks['information'], alpha, spending)
+    looks['alpha_spent'] = spent
+    looks['boundary_z'] = boundaries
+    looks['boundary_p'] = 2 * norm.sf(boundaries)
+    looks['decision'] = np.select(
+        [looks['z'].abs() >= looks['boundary_z'], looks['information'] >= 1.0],
+        ["stop: P and N differ", "stop: no difference at the planned maximum"],
+        default="continue")
+    stopped = looks[looks['decision'] != "continue"]
+    decision = (stopped if len(stopped) else looks)['decision'].iloc[0 if len(stopped) else -1]
+    return looks[INTERIM_COLUMNS], decision
+
+
+def print_interim_report(looks, decision, spending='obrien-fleming'):
+    print(f"Group-sequential Wilcoxon test of P - N ({spending} alpha spending):")
+    print(looks.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"Decision: {decision}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    planned = int(sys.argv[1]) if len(sys.argv) > 1 else PLANNED_SESSIONS
+    kind = sys.argv[2] if len(sys.argv) > 2 else 'obrien-fleming'
+    table, result = interim_analysis(planned_sessions=planned, spending=kind)
+    print_interim_report(table, result, kind)
@@ -0,0 +1,211 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Joint maximum likelihood (JML) for the Rasch model
+RASCH_MAX_ITER = 100
+RASCH_TOLERANCE = 1e-6
+# Largest Newton step on the logit scale, keeps the first iterations stable
+RASCH_MAX_STEP = 1.0
+
+ITEM_COLUMNS = ['word_id', 'ice', 'eng', 'n', 'p_value', 'discrimination',
+                'difficulty', 'difficulty_se', 'infit', 'outfit']
+
+
+def response_matrix(scored, person_col='id', item_col='word_id'):
+    """
+    Sparse participant x item matrices from scored trial rows
+
+    A word answered twice by the same participant (legacy files have both
+    tests side by side) counts as two attempts of the same cell.
+
+    Returns:
+        (correct, attempts, persons, items): two CSR matrices with the number
+        of correct answers and of attempts per cell, and the row/column labels
+    """
+    rows = scored[[person_col, item_col, 'correct']].dropna(subset=[person_col, item_col])
+    person_codes, persons = pd.factorize(rows[person_col].astype(str), sort=True)
+    item_codes, items = pd.factorize(rows[item_col], sort=True)
+    shape = (len(persons), len(items))
+
+    # COO -> CSR sums the duplicates of a cell
+    attempts = sparse.coo_matrix((np.ones(len(rows)), (person_codes, item_codes)), shape=shape).tocsr()
+    correct = sparse.coo_matrix((rows['correct'].to_numpy(dtype=float), (person_codes, item_codes)),
+                                shape=shape).tocsr()
+    return correct, attempts, np.asarray(persons), np.asarray(items)
+
+
+def _cells(correct, attempts):
+    """Observed cells as flat arrays (person, item, correct, attempts)"""
+    attempts = attempts.tocoo()
+    # Same sparsity pattern: correct can only be non-zero where there were attempts
+    hits = np.asarray(correct[attempts.row, attempts.col]).ravel()
+    return attempts.row, attempts.col, hits, attempts.data
+
+
+def classical_item_statistics(correct, attempts):
+    """
+    Classical test theory statistics per item (column)
+
+    Returns:
+        (n, p_value, discrimination): attempts, proportion correct and the
+        corrected item-rest correlation (item score vs the participant's
+        proportion correct on all other items)
+    """
+    person, item, hits, tries = _cells(correct, attempts)
+    n_items = attempts.shape[1]
+
+    n = np.bincount(item, weights=tries, minlength=n_items)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p_value = np.bincount(item, weights=hits, minlength=n_items) / n
+
+        # Rest score of every cell: the participant's other items
+        person_hits = np.bincount(person, weights=hits, minlength=attempts.shape[0])
+        person_tries = np.bincount(person, weights=tries, minlength=attempts.shape[0])
+        score = hits / tries
+        rest = (person_hits[person] - hits) / (person_tries[person] - tries)
+
+        # Pearson correlation per item from grouped sums
+        def item_sum(values):
+            return np.bincount(item, weights=values, minlength=n_items)
+
+        count = np.bincount(item, minlength=n_items)
+        mean_score = item_sum(score) / count
+        mean_rest = item_sum(rest) / count
+        covariance = item_sum(score * rest) / count - mean_score * mean_rest
+        var_score = item_sum(score ** 2) / count - mean_score ** 2
+        var_rest = item_sum(rest ** 2) / count - mean_rest ** 2
+        discrimination = covariance / np.sqrt(var_score * var_rest)
+    return n, p_value, discrimination
+
+
+def fit_rasch(correct, attempts, max_iter=RASCH_MAX_ITER, tolerance=RASCH_TOLERANCE):
+    """
+    Rasch (1PL) model by joint maximum likelihood, vectorized over all cells
+
+    P(correct) = 1 / (1 + exp(-(ability[person] - difficulty[item]))), with
+    alternating Newton steps for abilities and difficulties. Participants and
+    items with all or none correct have no finite estimate and are left out
+    (NaN). Difficulties are centered on 0 and get the usual (L - 1) / L JML
+    bias correction.
+
+    Returns:
+        Dict with ability, difficulty, difficulty_se, infit, outfit (per
+        item, NaN where not estimable) and iterations
+    """
+    person, item, hits, tries = _cells(correct, attempts)
+    n_persons, n_items = attempts.shape
+
+    # Drop extreme scores until every remaining row and column has both outcomes
+    keep = np.ones(len(person), dtype=bool)
+    while True:
+        person_hits = np.bincount(person[keep], weights=hits[keep], minlength=n_persons)
+        person_tries = np.bincount(person[keep], weights=tries[keep], minlength=n_persons)
+        item_hits = np.bincount(item[keep], weights=hits[keep], minlength=n_items)
+        item_tries = np.bincount(item[keep], weights=tries[keep], minlength=n_items)
+        person_ok = (person_hits > 0) & (person_hits < person_tries)
+        item_ok = (item_hits > 0) & (item_hits < item_tries)
+        still = keep & person_ok[person] & item_ok[item]
+        if still.sum() == keep.sum():
+            break
+        keep = still
+
+    ability = np.full(n_persons, np.nan)
+    difficulty = np.full(n_items, np.nan)
+    result = {'ability': ability, 'difficulty': difficulty, 'difficulty_se': np.full(n_items, np.nan),
+              'infit': np.full(n_items, np.nan), 'outfit': np.full(n_items, np.nan), 'iterations': 0}
+    if not keep.any():
+        return result
+
+    person, item, hits, tries = person[keep], item[keep], hits[keep], tries[keep]
+    theta = np.zeros(n_persons)
+    beta = np.zeros(n_items)
+    # Start from the logits of the raw proportions
+    theta[person_ok] = np.log(person_hits[person_ok] / (person_tries[person_ok] - person_hits[person_ok]))
+    beta[item_ok] = -np.log(item_hits[item_ok] / (item_tries[item_ok] - item_hits[item_ok]))
+    beta[item_ok] -= beta[item_ok].mean()
+
+    for iteration in range(1, max_iter + 1):
+        p = 1 / (1 + np.exp(beta[item] - theta[person]))
+        expected = tries * p
+        information = tries * p * (1 - p)
+        person_step = np.bincount(person, weights=hits - expected, minlength=n_persons) / np.maximum(
+            np.bincount(person, weights=information, minlength=n_persons), 1e-12)
+        theta += np.clip(person_step, -RASCH_MAX_STEP, RASCH_MAX_STEP)
+
+        p = 1 / (1 + np.exp(beta[item] - theta[person]))
+        expected = tries * p
+        information = tries * p * (1 - p)
+        item_information = np.bincount(item, weights=information, minlength=n_items)
+        item_step = np.bincount(item, weights=hits - expected, minlength=n_items) / np.maximum(
+            item_information, 1e-12)
+        beta -= np.clip(item_step, -RASCH_MAX_STEP, RASCH_MAX_STEP)
+        beta[item_ok] -= beta[item_ok].mean()
+
+        if max(np.abs(person_step).max(), np.abs(item_step).max()) < tolerance:
+            break
+
+    # Item fit: outfit = mean squared standardized residual, infit = information weighted
+    p = 1 / (1 + np.exp(beta[item] - theta[person]))
+    variance = tries * p * (1 - p)
+    squared_residual = (hits - tries * p) ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        outfit = np.bincount(item, weights=squared_residual / variance, minlength=n_items) / np.bincount(
+            item, minlength=n_items)
+        infit = np.bincount(item, weights=squared_residual, minlength=n_items) / item_information
+
+    n_estimated = item_ok.sum()
+    correction = (n_estimated - 1) / n_estimated if n_estimated > 1 else 1.0
+    ability[person_ok] = theta[person_ok]
+    difficulty[item_ok] = beta[item_ok] * correction
+    result['difficulty_se'][item_ok] = 1 / np.sqrt(item_information[item_ok])
+    result['infit'][item_ok] = infit[item_ok]
+    result['outfit'][item_ok] = outfit[item_ok]
+    result['iterations'] = iteration
+    return result
+
+
+def item_statistics(scored):
+    """
+    Difficulty, discrimination and Rasch fit for every word_id
+
+    Rows without a condition (legacy pilot files) are left out: they use a
+    different word list under the same word_ids.
+
+    Args:
+        scored: Scored trial rows (score_trials output) of any number of sessions
+
+    Returns:
+        DataFrame with ITEM_COLUMNS, one row per word_id: n attempts,
+        p_value (proportion correct), discrimination (item-rest
+        correlation), Rasch difficulty (logits, higher = harder) with its
+        standard error and the infit/outfit mean squares
+    """
+    scored = scored.dropna(subset=['condition'])
+    correct, attempts, _, items = response_matrix(scored)
+    n, p_value, discrimination = classical_item_statistics(correct, attempts)
+    rasch = fit_rasch(correct, attempts)
+
+    words = scored.drop_duplicates('word_id').set_index('word_id')[['ice', 'eng']]
+    table = pd.DataFrame({
+        'word_id': items,
+        'n': n.astype(int),
+        'p_value': p_value,
+        'discrimination': discrimination,
+        'difficulty': rasch['difficulty'],
+        'difficulty_se': rasch['difficulty_se'],
+        'infit': rasch['infit'],
+        'outfit': rasch['outfit'],
+    }).join(words, on='word_id')
+    return table[ITEM_COLUMNS]
+
+
+if __name__ == "__main__":
+    import time
+    from analysis_data import load_trials
+    from scoring import score_trials
+
+    start = time.perf_counter()
+    items = item_statistics(score_trials(load_trials("data")))
+    print(f"Item statistics for {len(items)} words in {time.perf_counter() - start:.3f} s")
+    print(items.sort_values('difficulty').to_string(index=False, float_format=lambda v: f"{v:.3f}"))
@@ -1,15 +1,27 @@
 import tkinter as tk
 from tkinter import ttk
-import pandas as pd
 import csv
+import threading
 import uuid
 import os
 import random
 from datetime import datetime
 from test_screen import TestScreen
 from second_test_screen import SecondTestScreen
+from answer_journal import AnswerJournal, compact_session
+from session_registry import SessionRegistry
+from session_store import SQLiteSessionStore
+from screen_manager import ScreenManager
+from results_engine import score_answers, results_from_trials
+from word_bank import load_word_bank
 import textwrap
 
+# Set to True to record sessions in data/experiments.sqlite (the CSV file is still exported)
+USE_SQLITE_STORE = False
+
+# Number of typos (edits) still counted as correct on the results screen; 0 = exact match only
+LENIENT_MAX_EDITS = 0
+
 class ExperimentApp:
     def __init__(self, root):
         self.root = root
@@ -20,6 +32,9 @@ class ExperimentApp:
         # Generate unique ID for this session
         self.unique_id = str(uuid.uuid4())[:8]  # Short unique ID
 
+        # Session id -> CSV file, so screens never have to search data/
+        self.session_registry = SessionRegistry()
+
         # Initialize personalization flag (will be set based on button click)
         self.personalization_flag = None
 
@@ -29,14 +44,45 @@ class ExperimentApp:
         # Initialize YouTube usage rating (will be set based on button click)
         self.youtube_usage = None
 
-        # Load word data
-        self.word_data = self.load_word_data()
+        # Answers handed over by the test screens (word_id -> answer)
+        self.first_test_answers = None
+        self.second_test_answers = None
+
+        # AnswerJournal (or SQLite session writer) of the session, created with its CSV file
+        self.answer_journal = None
 
-        # Select random words for both phases
-        self.select_random_word_sets()
+        # Word data is loaded in the background while the participant answers the
+        # welcome questions, so the window appears before pandas is imported
+        self.word_data = None
+        self.word_data_ready = threading.Event()
+
+        # Journal compactions run on worker threads, one at a time
+        self.compaction_lock = threading.Lock()
+
+        # Every screen is built once and then only shown/hidden
+        self.screens = ScreenManager(self.root)
 
         # Show welcome screen
         self.show_welcome_screen()
+        self.root.after_idle(self.start_word_data_loading)
+
+    def start_word_data_loading(self):
+        """Start loading the word bank on a background thread"""
+        threading.Thread(target=self.prepare_word_sets, daemon=True).start()
+
+    def prepare_word_sets(self):
+        """Load word data and select the random words for both phases (no Tk calls here)"""
+        try:
+            self.word_data = self.load_word_data()
+            self.select_random_word_sets()
+        finally:
+            self.word_data_ready.set()
+
+    def wait_for_word_data(self):
+        """Block until the word sets are ready (normally done long before they are needed)"""
+        if not self.word_data_ready.is_set():
+            print("Waiting for word data to finish loading...")
+            self.word_data_ready.wait()
 
     def create_footer(self, parent_frame):
         """Create a standard footer for all screens"""
@@ -94,62 +140,12 @@ class ExperimentApp:
         print(f"Phase 2 first word: {self.second_phase_words.iloc[0]['ice']} -> {self.second_phase_words.iloc[0]['eng']} (word_id: {self.second_phase_words.iloc[0]['word_id']})")
 
     def load_word_data(self):
-        """Load word data from Excel file"""
+        """Load word data from the Excel file (via its compiled cache)"""
+        import pandas as pd
+
         try:
-            df = pd.read_excel('word_pairs/Icelandic-English-Danish_40Words.xlsx')
-            print(f"Excel file loaded successfully! Shape: {df.shape}")
-            print(f"Columns: {df.columns.tolist()}")
-
-            # Check if the Excel file has the expected columns
-            # Try different possible column name variations
-            ice_col = None
-            eng_col = None
-            word_id_col = None
-
-            # Look for Icelandic column (could be 'ice', 'icelandic', or index-based)
-            for col in df.columns:
-                col_str = str(col).lower()
-                if 'ice' in col_str or 'island' in col_str:
-                    ice_col = col
-                    break
-
-            # Look for English column (could be 'eng', 'english', or index-based)
-            for col in df.columns:
-                col_str = str(col).lower()
-                if 'eng' in col_str or 'english' in col_str:
-                    eng_col = col
-                    break
-
-            # Look for word_id column
-            for col in df.columns:
-                col_str = str(col).lower()
-                if 'word_id' in col_str or 'id' in col_str:
-                    word_id_col = col
-                    break
-
-            # If we can't find named columns, assume columns by position
-            if ice_col is None and eng_col is None:
-                if len(df.columns) >= 2:
-                    # Assume first column is Icelandic, second is English
-                    ice_col = df.columns[0]
-                    eng_col = df.columns[1]
-
-            print(f"Using columns - word_id: {word_id_col}, ice: {ice_col}, eng: {eng_col}")
-
-            # Create standardized DataFrame
-            result_data = []
-            for index, row in df.iterrows():
-                word_id = row[word_id_col] if word_id_col else index + 1
-                ice_word = row[ice_col] if ice_col else ''
-                eng_word = row[eng_col] if eng_col else ''
-
-                result_data.append({
-                    'word_id': word_id,
-                    'ice': ice_word,
-                    'eng': eng_word
-                })
-
-            result_df = pd.DataFrame(result_data)
+            # Standardized table from the compiled cache (rebuilt from the workbook when it changes)
+            result_df = load_word_bank('word_pairs/Icelandic-English-Danish_40Words.xlsx')
             print(f"Processed {len(result_df)} word pairs")
             print("First few pairs:")
             for i in range(min(5, len(result_df))):
@@ -169,12 +165,13 @@ class ExperimentApp:
 
     def show_welcome_screen(self):
         """Display the welcome screen"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.show('welcome', self.build_welcome_screen)
+        self.screens.prepare_later('information', self.build_information_screen)
 
+    def build_welcome_screen(self, screen):
+        """Build the welcome screen with the Icelandic and YouTube Shorts questions"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # Create footer
@@ -413,6 +410,8 @@ class ExperimentApp:
 
     def create_csv_file(self):
         """Create CSV file with unique name and populate with data"""
+        self.wait_for_word_data()
+
         # Create unique filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"data/experiment_{self.unique_id}_{timestamp}.csv"
@@ -464,6 +463,8 @@ class ExperimentApp:
 
         # Store the initial choice for test screens to use
         self.csv_filename = filename
+        self.session_registry.register(self.unique_id, filename)
+        self.answer_journal = None
 
         # Write to CSV file
         try:
@@ -471,6 +472,21 @@ class ExperimentApp:
                 writer = csv.writer(csvfile)
                 writer.writerows(csv_data)
             print(f"CSV file created: {filename}")
+            if USE_SQLITE_STORE:
+                # Answers are written to SQLite and exported to the CSV at the end
+                store = SQLiteSessionStore()
+                store.create_session(
+                    self.unique_id,
+                    # (test_id, word_id, ice, eng, condition) of every CSV row
+                    [(row[5], row[1], row[2], row[3], row[6]) for row in csv_data[1:]],
+                    knows_icelandic=self.knows_icelandic or '',
+                    youtube_usage=self.youtube_usage or '',
+                    csv_file=filename
+                )
+                self.answer_journal = store.session_writer(self.unique_id, filename)
+            else:
+                # Answers are journaled while the tests run and compacted into the CSV at the end
+                self.answer_journal = AnswerJournal(filename)
             print(f"Initial personalization choice: {'Personalized' if self.personalization_flag else 'Non-personalized'}")
             print(f"Knows Icelandic: {self.knows_icelandic if self.knows_icelandic else 'Not specified'}")
             print(f"YouTube usage: {self.youtube_usage if self.youtube_usage else 'Not specified'}")
@@ -482,12 +498,14 @@ class ExperimentApp:
 
     def show_information_screen(self):
         """Display the information screen with dummy text"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.show('information', self.build_information_screen)
+        # The word sets are ready (create_csv_file waited for them)
+        self.screens.prepare_later('first_memorizing', self.build_memorizing_screen)
 
+    def build_information_screen(self, screen):
+        """Build the information screen"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
         # Create footer
@@ -571,12 +589,16 @@ class ExperimentApp:
 
     def show_memorizing_screen(self):
         """Display the memorizing screen with word pairs, information, and countdown timer"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('first_memorizing', self.build_memorizing_screen)
+        self.screens.prepare_later('first_break', self.build_first_break_screen)
 
+        # Start the countdown timer
+        self.start_countdown_timer()
+
+    def build_memorizing_screen(self, screen):
+        """Build the first memorizing screen; returns its timer label"""
         # Create main container
-        main_container = tk.Frame(self.root, bg='white')
+        main_container = tk.Frame(screen, bg='white')
         main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # Create footer
@@ -702,14 +724,14 @@ class ExperimentApp:
         )
         timer_label.pack()
 
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             timer_frame,
             text="08:00",
             font=("Arial", 20, "bold"),
             bg='lightgray',
             fg='red'  # Red color
         )
-        self.timer_display.pack()
+        timer_display.pack()
 
         # Information text area
         info_title = tk.Label(
@@ -768,8 +790,7 @@ class ExperimentApp:
         )
        # next_button.pack()
 
-        # Start the countdown timer
-        self.start_countdown_timer()
+        return timer_display
 
     def display_word_grid(self, parent_frame, word_data, start_index=0, count=25):
         """Display word pairs in a 5x5 grid"""
@@ -875,17 +896,25 @@ class ExperimentApp:
     def on_first_test_completed(self, answers):
         """Handle FIRST test completion"""
         print(f"First test completed with {len(answers)} answers")
+        self.first_test_answers = dict(answers)
+        # The CSV gets the first test's answers while the participant is on the break
+        self.compact_answers_later()
         # After first test, show 20-second break before second memorizing screen
         self.show_intermediate_break_screen()
 
     def show_intermediate_break_screen(self):
         """Display a 10-second break screen between first test and second memorizing screen"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('intermediate_break', self.build_intermediate_break_screen)
+        self.screens.prepare_later('second_memorizing', self.build_second_memorizing_screen)
 
+        # Start the 10-second countdown
+        self.intermediate_break_countdown = 10
+        self.start_intermediate_break_countdown()
+
+    def build_intermediate_break_screen(self, screen):
+        """Build the break screen between the first test and the second memorizing screen; returns its timer label"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -902,14 +931,14 @@ class ExperimentApp:
         title_label.pack(pady=(50, 20))
 
         # Countdown timer display
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             main_frame,
             text="20",
             font=("Arial", 72, "bold"),
             bg='white',
             fg='red'
         )
-        self.timer_display.pack(pady=40)
+        timer_display.pack(pady=40)
 
         # Instructions
         instruction_text = tk.Label(
@@ -937,9 +966,7 @@ class ExperimentApp:
         )
         skip_button.pack(pady=10)
 
-        # Start the 10-second countdown
-        self.intermediate_break_countdown = 10
-        self.start_intermediate_break_countdown()
+        return timer_display
 
     def start_intermediate_break_countdown(self):
         """Start the countdown timer for the intermediate break"""
@@ -974,12 +1001,21 @@ class ExperimentApp:
         if hasattr(self, 'time_remaining'):
             self.time_remaining = 0 # Stop the timer from continuing
 
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('first_break', self.build_first_break_screen)
+        self.screens.prepare_later('first_get_ready', self.build_first_get_ready_screen)
+
+        # Back to "Ready" with the Start Timer button
+        self.timer_display.config(text="Ready", fg='gray')
+        if not self.start_timer_button.winfo_manager():
+            self.start_timer_button.pack(pady=10)
 
+        # Initialize but don't start the timer yet
+        self.break_time_remaining = 8 * 60
+
+    def build_first_break_screen(self, screen):
+        """Build the first YouTube break screen; returns its timer label"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -996,14 +1032,14 @@ class ExperimentApp:
         title_label.pack(pady=(0, 20))
 
         # Countdown timer display (initially shows "Ready")
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             main_frame,
             text="Ready",
             font=("Arial", 48, "bold"),
             bg='white',
             fg='gray'
         )
-        self.timer_display.pack(pady=20)
+        timer_display.pack(pady=20)
 
         # Instructions - choose based on personalization flag
         if self.personalization_flag:
@@ -1063,8 +1099,7 @@ class ExperimentApp:
         )
        # next_button.pack(pady=10)
 
-        # Initialize but don't start the timer yet
-        self.break_time_remaining = 8 * 60
+        return timer_display
 
     def start_first_break_timer(self):
         """Start the 8-minute break timer when the button is pressed"""
@@ -1118,12 +1153,29 @@ class ExperimentApp:
 
     def show_first_get_ready_screen(self):
         """Display the get ready screen before first test with 20 second countdown"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('first_get_ready', self.build_first_get_ready_screen)
 
+        # Build the test while the participant waits, so starting it only switches screens
+        self.test_screen = TestScreen(
+            root=self.root,
+            word_data=self.first_phase_words,
+            unique_id=self.unique_id,
+            personalization_flag=self.personalization_flag,
+            completion_callback=self.on_first_test_completed,
+            answer_journal=self.answer_journal,
+            session_path=self.session_registry.resolve(self.unique_id),
+            screens=self.screens,
+            start=False
+        )
+
+        # Start the 10-second countdown timer
+        self.get_ready_time_remaining = 10
+        self.update_first_get_ready_timer()
+
+    def build_first_get_ready_screen(self, screen):
+        """Build the get ready screen before the first test; returns its timer label"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -1140,14 +1192,14 @@ class ExperimentApp:
         title_label.pack(pady=(50, 30))
 
         # Countdown timer display
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             main_frame,
             text="20",
             font=("Arial", 72, "bold"),
             bg='white',
             fg='red'
         )
-        self.timer_display.pack(pady=40)
+        timer_display.pack(pady=40)
 
         # Instructions
         instruction_text = tk.Label(
@@ -1175,9 +1227,7 @@ class ExperimentApp:
         )
         skip_button.pack(pady=20)
 
-        # Start the 10-second countdown timer
-        self.get_ready_time_remaining = 10
-        self.update_first_get_ready_timer()
+        return timer_display
 
     def update_first_get_ready_timer(self):
         """Update the get ready timer display for first test"""
@@ -1211,14 +1261,8 @@ class ExperimentApp:
                 pass
 
         print("Get ready finished! Starting first test...")
-        # Start first test screen
-        self.test_screen = TestScreen(
-            root=self.root,
-            word_data=self.first_phase_words,
-            unique_id=self.unique_id,
-            personalization_flag=self.personalization_flag,
-            completion_callback=self.on_first_test_completed
-        )
+        # Show the first test screen built during the countdown
+        self.test_screen.start()
 
     def skip_first_get_ready(self):
         """Skip the first get ready countdown and start test immediately"""
@@ -1283,12 +1327,21 @@ class ExperimentApp:
             except:
                 pass
 
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('second_break', self.build_second_break_screen)
+        self.screens.prepare_later('second_get_ready', self.build_second_get_ready_screen)
 
+        # Back to "Ready" with the Start Timer button
+        self.timer_display.config(text="Ready", fg='gray')
+        if not self.start_second_timer_button.winfo_manager():
+            self.start_second_timer_button.pack(pady=10)
+
+        # Initialize but don't start the timer yet
+        self.second_break_time_remaining = 8 * 60
+
+    def build_second_break_screen(self, screen):
+        """Build the second YouTube break screen; returns its timer label"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -1305,14 +1358,14 @@ class ExperimentApp:
         title_label.pack(pady=(0, 20))
 
         # Countdown timer display (initially shows "Ready")
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             main_frame,
             text="Ready",
             font=("Arial", 48, "bold"),
             bg='white',
             fg='gray'
         )
-        self.timer_display.pack(pady=20)
+        timer_display.pack(pady=20)
 
         # Instructions - choose OPPOSITE of personalization flag (swap for second break)
         if self.personalization_flag:
@@ -1373,8 +1426,7 @@ class ExperimentApp:
         )
         #next_button.pack(pady=10)
 
-        # Initialize but don't start the timer yet
-        self.second_break_time_remaining = 8 * 60
+        return timer_display
 
     def start_second_break_timer(self):
         """Start the 8-minute second break timer when the button is pressed"""
@@ -1428,12 +1480,29 @@ class ExperimentApp:
 
     def show_second_get_ready_screen(self):
         """Display the get ready screen before second test with 20 second countdown"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('second_get_ready', self.build_second_get_ready_screen)
+
+        # Build the second test while the participant waits, so starting it only switches screens
+        self.second_test_screen = SecondTestScreen(
+            root=self.root,
+            word_data=self.second_phase_words,
+            unique_id=self.unique_id,
+            personalization_flag=self.personalization_flag,
+            completion_callback=self.on_second_test_completed,
+            answer_journal=self.answer_journal,
+            session_path=self.session_registry.resolve(self.unique_id),
+            screens=self.screens,
+            start=False
+        )
 
+        # Start the 10-second countdown timer
+        self.get_ready_time_remaining_2 = 10
+        self.update_second_get_ready_timer()
+
+    def build_second_get_ready_screen(self, screen):
+        """Build the get ready screen before the second test; returns its timer label"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -1450,14 +1519,14 @@ class ExperimentApp:
         title_label.pack(pady=(50, 30))
 
         # Countdown timer display
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             main_frame,
             text="20",
             font=("Arial", 72, "bold"),
             bg='white',
             fg='red'
         )
-        self.timer_display.pack(pady=40)
+        timer_display.pack(pady=40)
 
         # Instructions
         instruction_text = tk.Label(
@@ -1485,9 +1554,7 @@ class ExperimentApp:
         )
         skip_button.pack(pady=20)
 
-        # Start the 10-second countdown timer
-        self.get_ready_time_remaining_2 = 10
-        self.update_second_get_ready_timer()
+        return timer_display
 
     def update_second_get_ready_timer(self):
         """Update the get ready timer display for second test"""
@@ -1521,14 +1588,8 @@ class ExperimentApp:
                 pass
 
         print("Get ready finished! Starting second test...")
-        # Start second test screen
-        self.second_test_screen = SecondTestScreen(
-            root=self.root,
-            word_data=self.second_phase_words,
-            unique_id=self.unique_id,
-            personalization_flag=self.personalization_flag,
-            completion_callback=self.on_second_test_completed
-        )
+        # Show the second test screen built during the countdown
+        self.second_test_screen.start()
 
     def skip_second_get_ready(self):
         """Skip the second get ready countdown and start test immediately"""
@@ -1546,20 +1607,50 @@ class ExperimentApp:
     def on_second_test_completed(self, answers):
         """Handle SECOND test completion"""
         print(f"Second test completed with {len(answers)} answers")
+        self.second_test_answers = dict(answers)
         # Show final completion screen
         self.show_final_completion_screen()
 
     def show_final_completion_screen(self):
         """Display the final results screen with calculated statistics"""
-        # Calculate results from CSV
+        # Results come from the answers in memory; the CSV is written afterwards, off the UI thread
         results = self.calculate_results()
 
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        # The results are new every time, so this screen is not reused
+        self.screens.discard('final_completion')
+        self.screens.show('final_completion', lambda screen: self.build_final_completion_screen(screen, results))
+
+        if self.answer_journal:
+            self.answer_journal.close()
+            self.compact_answers_later()
+
+    def compact_answers_later(self):
+        """
+        Write the journaled answers into the session CSV on a worker thread
+
+        Runs at every test boundary, so the CSV holds the answers of all
+        finished tests if the app dies later in the session. Answers of a
+        test that was still running are only in the journal then;
+        `python src/answer_journal.py` writes them into the CSV.
+        """
+        if not self.answer_journal:
+            return
+        self.answer_journal.flush()
+        # Not a daemon: closing the window waits for the CSV to be written
+        threading.Thread(target=self.compact_answers, args=(self.answer_journal,)).start()
+
+    def compact_answers(self, journal):
+        """Compact the journal into the CSV (worker thread; one compaction at a time)"""
+        with self.compaction_lock:
+            try:
+                journal.compact()
+            except Exception as e:
+                print(f"Error writing the answers to the CSV: {e}")
 
+    def build_final_completion_screen(self, screen, results):
+        """Build the results screen for the given results (None if they could not be calculated)"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -1853,192 +1944,32 @@ class ExperimentApp:
         ).pack()
 
     def calculate_results(self):
-        """Calculate results from the CSV file"""
+        """Calculate results from the answers in memory (the CSV only for sessions recovered from disk)"""
         try:
-            data_dir = "data"
-            if not os.path.exists(data_dir):
-                print("Data directory not found")
-                return None
-
             # Find the CSV file for this session
-            csv_files = [f for f in os.listdir(data_dir)
-                        if f.startswith(f"experiment_{self.unique_id}") and f.endswith('.csv')]
-
-            if not csv_files:
-                print("No CSV file found")
-                return None
-
-            csv_files.sort()
-            latest_csv = os.path.join(data_dir, csv_files[-1])
-
-            print(f"Calculating results from: {latest_csv}")
-
-            # Read the CSV file
-            df = pd.read_csv(latest_csv)
-
-            # Initialize counters
-            first_correct = 0
-            first_incorrect = 0
-            first_no_answer = 0
-            first_answered = 0
-            second_correct = 0
-            second_incorrect = 0
-            second_no_answer = 0
-            second_answered = 0
-
-            # Create dictionaries to store answers by word_id for both tests
-            first_test_answers = {}  # word_id -> answer
-            second_test_answers = {}  # word_id -> answer
-
-            first_details = []
-            second_details = []
-
-            # Process each row from CSV and store answers by word_id
-            for _, row in df.iterrows():
-                answer_raw = row.get('answer', '')
-                
-                # Handle empty/null answers and "none" as no answer
-                if pd.isna(answer_raw) or answer_raw == '' or str(answer_raw).strip().lower() == 'none':
-                    answer = ''
-                    answer_display = '(no answer)'
-                else:
-                    answer = str(answer_raw).strip().lower()
-                    answer_display = str(answer_raw).strip()
-                
-                # Get word_id and test_id
-                word_id = row.get('word_id', '')
-                test_id_raw = row.get('test_id', '')
-                if pd.isna(test_id_raw):
-                    continue
-                test_id = str(int(float(test_id_raw))) if test_id_raw != '' else ''
-
-                # Store the answer by word_id and test_id
-                if test_id == '0':
-                    first_test_answers[word_id] = {
-                        'answer': answer,
-                        'answer_display': answer_display,
-                        'ice': row.get('ice', ''),
-                        'eng': str(row.get('eng', '')).strip().lower()
-                    }
-                elif test_id == '1':
-                    second_test_answers[word_id] = {
-                        'answer': answer,
-                        'answer_display': answer_display,
-                        'ice': row.get('ice', ''),
-                        'eng': str(row.get('eng', '')).strip().lower()
-                    }
-
-            # Now process all words from first phase
-            for _, word_row in self.first_phase_words.iterrows():
-                word_id = word_row['word_id']
-                ice_word = word_row['ice']
-                eng_word = str(word_row['eng']).strip().lower()
-                
-                # Check if this word was answered in the CSV
-                if word_id in first_test_answers:
-                    answer_data = first_test_answers[word_id]
-                    answer = answer_data['answer']
-                    answer_display = answer_data['answer_display']
-                else:
-                    # Word was not answered at all
-                    answer = ''
-                    answer_display = '(no answer)'
-                
-                # Determine correctness
-                is_empty = (answer == '')
-                is_correct = (answer == eng_word and answer != '')
-                
-                if is_empty:
-                    first_no_answer += 1
-                elif is_correct:
-                    first_correct += 1
-                    first_answered += 1
-                else:
-                    first_incorrect += 1
-                    first_answered += 1
-                
-                first_details.append({
-                    'ice': ice_word,
-                    'eng': word_row['eng'],
-                    'answer': answer_display,
-                    'correct': is_correct,
-                    'is_empty': is_empty
-                })
-
-            # Now process all words from second phase
-            for _, word_row in self.second_phase_words.iterrows():
-                word_id = word_row['word_id']
-                ice_word = word_row['ice']
-                eng_word = str(word_row['eng']).strip().lower()
-                
-                # Check if this word was answered in the CSV
-                if word_id in second_test_answers:
-                    answer_data = second_test_answers[word_id]
-                    answer = answer_data['answer']
-                    answer_display = answer_data['answer_display']
-                else:
-                    # Word was not answered at all
-                    answer = ''
-                    answer_display = '(no answer)'
-                
-                # Determine correctness
-                is_empty = (answer == '')
-                is_correct = (answer == eng_word and answer != '')
-                
-                if is_empty:
-                    second_no_answer += 1
-                elif is_correct:
-                    second_correct += 1
-                    second_answered += 1
-                else:
-                    second_incorrect += 1
-                    second_answered += 1
-                
-                second_details.append({
-                    'ice': ice_word,
-                    'eng': word_row['eng'],
-                    'answer': answer_display,
-                    'correct': is_correct,
-                    'is_empty': is_empty
-                })
-
-            # Fixed: Always use 25 as the total for each test (this is how many words are tested)
-            first_total = 25
-            second_total = 25
-
-            # Calculate percentages based on 25 questions each
-            first_percentage = (first_correct / first_total * 100) if first_total > 0 else 0
-            second_percentage = (second_correct / second_total * 100) if second_total > 0 else 0
-            total_correct = first_correct + second_correct
-            total_incorrect = first_incorrect + second_incorrect
-            total_no_answer = first_no_answer + second_no_answer
-            overall_percentage = (total_correct / 50 * 100)  # Out of 50 total (25+25)
-
-            results = {
-                'first_correct': first_correct,
-                'first_incorrect': first_incorrect,
-                'first_no_answer': first_no_answer,
-                'first_total': first_total,
-                'first_percentage': first_percentage,
-                'second_correct': second_correct,
-                'second_incorrect': second_incorrect,
-                'second_no_answer': second_no_answer,
-                'second_total': second_total,
-                'second_percentage': second_percentage,
-                'total_correct': total_correct,
-                'total_incorrect': total_incorrect,
-                'total_no_answer': total_no_answer,
-                'total_answered': 50,  # Always 50 (25 + 25)
-                'overall_percentage': overall_percentage,
-                'first_details': first_details,
-                'second_details': second_details,
-                'csv_file': latest_csv
-            }
+            latest_csv = self.session_registry.resolve(self.unique_id)
+
+            if self.first_test_answers is not None and self.second_test_answers is not None:
+                results = score_answers(
+                    self.first_phase_words, self.first_test_answers,
+                    self.second_phase_words, self.second_test_answers,
+                    csv_file=latest_csv,
+                    max_edits=LENIENT_MAX_EDITS
+                )
+            elif self.answer_journal:
+                # A test screen did not hand its answers over; the journal has them in memory
+                results = self.calculate_results_from_journal(latest_csv)
+            else:
+                # Resuming a crashed session - the CSV (plus its journal) is all we have
+                if not latest_csv:
+                    print("No CSV file found")
+                    return None
+                results = self.calculate_results_from_csv(latest_csv)
 
             print("Results calculated:")
-            print(f"  First Test: {first_correct} correct, {first_incorrect} incorrect, {first_no_answer} no answer")
-            print(f"  Second Test: {second_correct} correct, {second_incorrect} incorrect, {second_no_answer} no answer")
-            print(f"  Overall: {total_correct}/50 ({overall_percentage:.1f}%)")
+            print(f"  First Test: {results['first_correct']} correct, {results['first_incorrect']} incorrect, {results['first_no_answer']} no answer")
+            print(f"  Second Test: {results['second_correct']} correct, {results['second_incorrect']} incorrect, {results['second_no_answer']} no answer")
+            print(f"  Overall: {results['total_correct']}/50 ({results['overall_percentage']:.1f}%)")
 
             return results
 
@@ -2048,18 +1979,50 @@ class ExperimentApp:
             traceback.print_exc()
             return None
 
+    def calculate_results_from_journal(self, csv_file):
+        """Calculate results from the last answers the journal recorded in this session"""
+        answers = {0: {}, 1: {}}
+        for (test_id, word_id), answer in self.answer_journal.last_answers.items():
+            answers[test_id][word_id] = answer
+        return score_answers(
+            self.first_phase_words, answers[0],
+            self.second_phase_words, answers[1],
+            csv_file=csv_file,
+            max_edits=LENIENT_MAX_EDITS
+        )
+
+    def calculate_results_from_csv(self, csv_file):
+        """Calculate results by re-reading the session CSV (sessions recovered from disk only)"""
+        import pandas as pd
+
+        print(f"Calculating results from: {csv_file}")
+
+        # Apply any answers still sitting in the journal
+        compact_session(csv_file)
+
+        df = pd.read_csv(csv_file)
+        df = df[df['test_id'].notna()]
+        trials = pd.DataFrame({
+            'test_id': df['test_id'].astype(int),
+            'word_id': df['word_id'],
+            'ice': df['ice'],
+            'eng': df['eng'],
+            'answer_raw': df['answer']
+        })
+        return results_from_trials(trials, csv_file, LENIENT_MAX_EDITS)
+
     def on_timer_finished(self):
         """Handle when the first countdown timer reaches zero - compatibility method"""
         self.on_first_timer_finished()
 
     def show_break_screen(self):
         """Display the break screen with dummy text"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.show('break', self.build_break_screen)
 
+    def build_break_screen(self, screen):
+        """Build the break screen"""
         # Create main frame
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Create footer
@@ -2155,12 +2118,16 @@ class ExperimentApp:
             except:
                 pass
 
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.timer_display = self.screens.show('second_memorizing', self.build_second_memorizing_screen)
+        self.screens.prepare_later('second_break', self.build_second_break_screen)
+
+        # Start the countdown timer for second memorization
+        self.start_second_countdown_timer()
 
+    def build_second_memorizing_screen(self, screen):
+        """Build the second memorizing screen; returns its timer label"""
         # Create main container
-        main_container = tk.Frame(self.root, bg='white')
+        main_container = tk.Frame(screen, bg='white')
         main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
         # Create footer
@@ -2286,14 +2253,14 @@ class ExperimentApp:
         )
         timer_label.pack()
 
-        self.timer_display = tk.Label(
+        timer_display = tk.Label(
             timer_frame,
             text="04:00",  # Changed from "08:00" to "04:00"
             font=("Arial", 20, "bold"),
             bg='lightgray',
             fg='red'
         )
-        self.timer_display.pack()
+        timer_display.pack()
 
         # Information text area
         info_title = tk.Label(
@@ -2352,8 +2319,7 @@ class ExperimentApp:
         )
        # next_button.pack()
 
-        # Start the countdown timer for second memorization
-        self.start_second_countdown_timer()
+        return timer_display
 
 def main():
     root = tk.Tk()
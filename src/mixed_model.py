@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import minimize
+from scipy.special import expit
+from scipy.sparse.linalg import splu
+from scipy.stats import norm
+
+# Inner penalized IRLS (conditional modes for given random effect SDs)
+PIRLS_MAX_ITER = 50
+PIRLS_TOLERANCE = 1e-8
+# Step halvings per PIRLS iteration before giving up on the step
+PIRLS_MAX_HALVINGS = 20
+# Upper bound for a random intercept SD on the logit scale
+MAX_RANDOM_SD = 10.0
+
+REFERENCE_YOUTUBE_USAGE = "0-15 minutes"
+FIXED_COLUMNS = ['term', 'estimate', 'std_error', 'z', 'p_value', 'odds_ratio']
+
+
+def design_matrices(scored, reference_usage=REFERENCE_YOUTUBE_USAGE):
+    """
+    Fixed and random effect design of the trial-level model
+
+    Fixed effects: intercept, condition P (vs N), second test (vs first
+    test) and one dummy per youtube_usage band (vs reference_usage).
+    Random intercepts: one column per participant and per word_id.
+    Rows without a condition (legacy files) are left out.
+
+    Returns:
+        (y, X, Z, terms, groups): responses, sparse X and Z, the fixed
+        effect names and the number of levels of each random factor
+    """
+    trials = scored.dropna(subset=['condition', 'test_id', 'youtube_usage'])
+    n = len(trials)
+
+    usage = trials['youtube_usage'].astype(str)
+    bands = sorted(set(usage) - {reference_usage})
+    fixed = {
+        'Intercept': np.ones(n),
+        'condition[P]': (trials['condition'].astype(str) == 'P').to_numpy(dtype=float),
+        'second_test': (trials['test_id'].astype(int) == 1).to_numpy(dtype=float),
+    }
+    for band in bands:
+        fixed[f'youtube_usage[{band}]'] = (usage == band).to_numpy(dtype=float)
+    X = sparse.csr_matrix(np.column_stack(list(fixed.values())))
+
+    # One indicator column per level of each grouping factor
+    blocks = []
+    groups = {}
+    for factor in ['id', 'word_id']:
+        codes, levels = pd.factorize(trials[factor].astype(str))
+        blocks.append(sparse.csr_matrix((np.ones(n), (np.arange(n), codes)), shape=(n, len(levels))))
+        groups[factor] = len(levels)
+    Z = sparse.hstack(blocks, format='csr')
+
+    y = trials['correct'].to_numpy(dtype=float)
+    return y, X, Z, list(fixed), groups
+
+
+def _penalized_loglik(y, eta, v):
+    """Bernoulli log-likelihood minus |v|^2 / 2"""
+    return np.sum(y * eta - np.logaddexp(0, eta)) - 0.5 * v @ v
+
+
+def _pirls(y, X, ZL, start):
+    """
+    Penalized IRLS for (beta, v) with eta = X beta + ZL v and penalty |v|^2 / 2
+
+    Newton steps are halved while they do not improve the penalized
+    log-likelihood, so a poor start (e.g. large SDs) cannot diverge.
+
+    Returns:
+        (coefficients, mu, lu of the v-block of the Hessian, full Hessian)
+    """
+    p = X.shape[1]
+    design = sparse.hstack([X, ZL], format='csc')
+    penalty = sparse.diags(np.r_[np.zeros(p), np.ones(ZL.shape[1])], format='csc')
+    coefficients = start.copy()
+    eta = design @ coefficients
+    current = _penalized_loglik(y, eta, coefficients[p:])
+
+    for _ in range(PIRLS_MAX_ITER):
+        mu = expit(eta)
+        weights = np.maximum(mu * (1 - mu), 1e-12)
+        hessian = (design.T @ sparse.diags(weights) @ design + penalty).tocsc()
+        gradient = design.T @ (y - mu) - penalty @ coefficients
+        step = splu(hessian).solve(gradient)
+
+        for _ in range(PIRLS_MAX_HALVINGS):
+            candidate = coefficients + step
+            candidate_eta = design @ candidate
+            value = _penalized_loglik(y, candidate_eta, candidate[p:])
+            if value >= current - 1e-10:
+                break
+            step = step / 2
+        coefficients, eta, current = candidate, candidate_eta, value
+        if np.abs(step).max() < PIRLS_TOLERANCE:
+            break
+
+    mu = expit(eta)
+    weights = np.maximum(mu * (1 - mu), 1e-12)
+    hessian = (design.T @ sparse.diags(weights) @ design + penalty).tocsc()
+    random_block = hessian[p:, p:].tocsc()
+    return coefficients, mu, splu(random_block), hessian
+
+
+def _laplace_deviance(y, mu, v, random_lu):
+    """-2 log-likelihood, Laplace approximation around the conditional modes"""
+    mu = np.clip(mu, 1e-15, 1 - 1e-15)
+    loglik = np.sum(y * np.log(mu) + (1 - y) * np.log1p(-mu))
+    logdet = np.sum(np.log(np.abs(random_lu.U.diagonal())))
+    return -2 * loglik + v @ v + logdet
+
+
+def fit_logistic_mixed_model(scored, reference_usage=REFERENCE_YOUTUBE_USAGE):
+    """
+    Logistic mixed model of trial correctness with crossed random intercepts
+
+    logit P(correct) = fixed effects (condition, second test, youtube_usage)
+                       + u[participant] + w[word_id]
+
+    The random intercept SDs are estimated by maximizing the Laplace
+    approximation of the marginal likelihood; for given SDs the fixed
+    effects and conditional modes come from penalized IRLS on the sparse
+    [X | Z] design, so the cost grows with the number of trials, not with
+    participants x words.
+
+    Args:
+        scored: Scored trial rows (score_trials output)
+        reference_usage: youtube_usage band used as the reference level
+
+    Returns:
+        Dict with 'fixed' (DataFrame with FIXED_COLUMNS), 'random' (SD per
+        grouping factor), n_trials, groups, deviance and converged
+    """
+    y, X, Z, terms, groups = design_matrices(scored, reference_usage)
+    p = X.shape[1]
+    sizes = list(groups.values())
+    state = {'start': np.zeros(p + Z.shape[1])}
+
+    def scaled_z(sds):
+        return Z @ sparse.diags(np.repeat(sds, sizes))
+
+    def objective(sds):
+        coefficients, mu, random_lu, _ = _pirls(y, X, scaled_z(sds), state['start'])
+        state['start'] = coefficients
+        return _laplace_deviance(y, mu, coefficients[p:], random_lu)
+
+    optimum = minimize(objective, x0=np.full(len(sizes), 0.5), method='L-BFGS-B',
+                       bounds=[(0.0, MAX_RANDOM_SD)] * len(sizes))
+    sds = optimum.x
+    coefficients, mu, random_lu, hessian = _pirls(y, X, scaled_z(sds), state['start'])
+
+    # Covariance of beta: inverse of the Schur complement of the random-effect block
+    cross = hessian[p:, :p].toarray()
+    schur = hessian[:p, :p].toarray() - cross.T @ random_lu.solve(cross)
+    std_error = np.sqrt(np.diag(np.linalg.inv(schur)))
+
+    beta = coefficients[:p]
+    z = beta / std_error
+    fixed = pd.DataFrame({
+        'term': terms,
+        'estimate': beta,
+        'std_error': std_error,
+        'z': z,
+        'p_value': 2 * norm.sf(np.abs(z)),
+        'odds_ratio': np.exp(beta),
+    }, columns=FIXED_COLUMNS)
+    return {
+        'fixed': fixed,
+        'random': dict(zip(groups, sds)),
+        'n_trials': len(y),
+        'groups': groups,
+        'deviance': float(optimum.fun),
+        'converged': bool(optimum.success),
+    }
+
+
+if __name__ == "__main__":
+    import time
+    from analysis_data import load_trials
+    from scoring import score_trials
+
+    start = time.perf_counter()
+    model = fit_logistic_mixed_model(score_trials(load_trials("data")))
+    print(f"Fitted {model['n_trials']} trials in {time.perf_counter() - start:.3f} s "
+          f"(converged: {model['converged']})")
+    print(model['fixed'].to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print("Random intercept SDs:", {k: round(v, 4) for k, v in model['random'].items()})
@@ -0,0 +1,109 @@
+"""
+Power calibration from the session archive
+
+Estimates the inputs of the power calculations from the sessions in data/
+instead of textbook effect sizes: the observed P - N effect (and Cohen's
+d_z for the paired t-test), the accuracy in N, the number of items per
+test, the variance between participants and between words, and the
+learning effect of the second test (the last three from the trial-level
+mixed model). The trial rows come from the per-file cache of the shared
+loader, and the estimate itself is cached and only recomputed when the
+scored trials change, e.g. when new session files appear.
+
+Run from the project root:  python src/power_calibration.py
+"""
+import os
+import pickle
+
+import pandas as pd
+
+from analysis_data import load_scored_trials
+from mixed_model import fit_logistic_mixed_model
+
+# Bump when the estimates change
+CALIBRATION_CACHE_VERSION = 1
+CALIBRATION_CACHE_PATH = os.path.join("data", "calibration_cache.pkl")
+
+
+def estimate_calibration(trials):
+    """
+    Estimate the power inputs from scored trial rows
+
+    Returns:
+        Dict with n_sessions, baseline (mean accuracy N), effect (mean
+        accuracy P - N), sd_diff, cohens_dz, items (per test),
+        sd_participant and sd_item (random intercept SDs, logit scale) and
+        period_effect (second test, logit scale)
+    """
+    paired = trials.dropna(subset=['condition', 'test_id'])
+    accuracy = paired.groupby(['id', 'condition'], observed=True)['correct'].mean().unstack().dropna()
+    diffs = accuracy['P'] - accuracy['N']
+    items = paired.groupby(['id', 'test_id'], observed=True).size()
+
+    model = fit_logistic_mixed_model(paired)
+    coefficients = model['fixed'].set_index('term')['estimate']
+    return {
+        'n_sessions': len(accuracy),
+        'baseline': float(accuracy['N'].mean()),
+        'effect': float(diffs.mean()),
+        'sd_diff': float(diffs.std()),
+        'cohens_dz': float(diffs.mean() / diffs.std()),
+        'items': int(items.median()),
+        'sd_participant': float(model['random']['id']),
+        'sd_item': float(model['random']['word_id']),
+        'period_effect': float(coefficients['second_test']),
+    }
+
+
+def calibrate(data_dir="data", max_edits=0, cache_path=CALIBRATION_CACHE_PATH):
+    """
+    Calibration of the archive in data_dir, recomputed only when the trials change
+
+    Only new or changed session files are read (load_scored_trials); the
+    estimate is reused as long as the scored trials hash the same.
+    """
+    trials = load_scored_trials(data_dir, max_edits)
+    digest = int(pd.util.hash_pandas_object(trials.astype(str), index=False).sum())
+
+    try:
+        with open(cache_path, 'rb') as f:
+            stored = pickle.load(f)
+        if stored.get('version') == CALIBRATION_CACHE_VERSION and stored.get('digest') == digest:
+            return stored['calibration']
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    calibration = estimate_calibration(trials)
+    try:
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'version': CALIBRATION_CACHE_VERSION, 'digest': digest, 'calibration': calibration},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError as e:
+        print(f"Could not write calibration cache {cache_path}: {e}")
+    return calibration
+
+
+def simulation_design(calibration):
+    """Design parameters of power_simulation from a calibration"""
+    return {key: calibration[key] for key in ['baseline', 'items', 'sd_participant', 'sd_item', 'period_effect']}
+
+
+if __name__ == "__main__":
+    from power_simulation import power_curve, required_sample_size
+    from PowerCalculation_Ttest import calculate_sample_size
+
+    calibration = calibrate()
+    print("Calibration from the archive:")
+    for key, value in calibration.items():
+        print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+    # Paired t-test with the observed d_z (TTestPower is the one-sample/paired test)
+    print(f"Paired t-test, observed d_z: {calculate_sample_size(abs(calibration['cohens_dz']))} participants")
+
+    # Simulated Wilcoxon power with the observed variances, for the observed and larger effects
+    effects = sorted({round(abs(calibration['effect']), 4), 0.05, 0.1})
+    curve = power_curve(sample_sizes=[20, 40, 60, 80, 100, 150, 200], effects=effects, seed=42,
+                        **simulation_design(calibration))
+    print(curve.pivot(index='n', columns='effect', values='power').to_string(float_format=lambda v: f"{v:.3f}"))
+    print("Participants needed for 80% power (NaN: more than simulated):")
+    print(required_sample_size(curve).to_string())
@@ -0,0 +1,158 @@
+"""
+Sample size grids for the power scripts, memoized on disk
+
+Every point of a grid (effect size x alpha x power x ...) is a root search
+for the sample size. A calculator can solve all new points of a grid at
+once (solve_sample_sizes: bisection where every step is one vectorized
+power call); points it cannot solve fall back to the per-point
+solve_power. Solved points are stored in a pickle keyed by the calculator
+name and its parameters, so asking again for the same or an overlapping
+grid only solves the new points.
+"""
+import itertools
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# Bump when a calculator changes its results
+POWER_CACHE_VERSION = 1
+POWER_CACHE_PATH = os.path.join("data", "power_cache.pkl")
+
+# Bisection steps of solve_sample_sizes, far below one participant for any bracket
+BISECTION_STEPS = 64
+MAX_SAMPLE_SIZE = 1e7
+
+
+def _load_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            stored = pickle.load(f)
+        if stored.get('version') == POWER_CACHE_VERSION:
+            return stored
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+    return {'version': POWER_CACHE_VERSION, 'points': {}}
+
+
+def _point_key(name, params):
+    """Cache key of one grid point: calculator name and its sorted parameters"""
+    return (name,) + tuple(sorted((param, float(value) if isinstance(value, (int, float)) else value)
+                                  for param, value in params.items()))
+
+
+def solve_sample_sizes(power_function, target_power, low):
+    """
+    Continuous sample size at which the power reaches target_power, for many points at once
+
+    The upper bracket of every point starts at 2 * low and is doubled until
+    the power reaches the target, then the bracket is bisected. Each step
+    is one power_function call on all points. The power has to increase
+    with the sample size above low.
+
+    Args:
+        power_function: Function taking an array of sample sizes (one per
+            point) and returning the power of every point
+        target_power: Array of required powers
+        low: Smallest valid sample size (scalar or array)
+
+    Returns:
+        Array of sample sizes, NaN where no bracket up to MAX_SAMPLE_SIZE
+        was found or the power was NaN on the way
+    """
+    target_power = np.asarray(target_power, dtype=float)
+    low = np.broadcast_to(np.asarray(low, dtype=float), target_power.shape).copy()
+    high = 2 * low
+    while True:
+        short = (power_function(high) < target_power) & (high < MAX_SAMPLE_SIZE)
+        if not short.any():
+            break
+        high = np.where(short, 2 * high, high)
+    bracketed = (power_function(low) < target_power) & (power_function(high) >= target_power)
+    low = high / 2
+
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2
+        power = power_function(middle)
+        bracketed &= ~np.isnan(power)
+        reached = power >= target_power
+        high = np.where(reached, middle, high)
+        low = np.where(reached, low, middle)
+    return np.where(bracketed, high, np.nan)
+
+
+def memoized_grid(name, calculate, grid, cache_path=POWER_CACHE_PATH, calculate_batch=None):
+    """
+    Evaluate calculate on every combination of grid values, solving only new points
+
+    Args:
+        name: Name of the calculator, part of the cache key (e.g. 'ttest')
+        calculate: Function taking the grid parameters as keyword arguments
+        grid: Dict parameter name -> list of values
+        cache_path: Pickle with the solved points
+        calculate_batch: Function taking a DataFrame of points (one column
+            per parameter) and returning the sample size of every point in
+            one pass (NaN: solve that point with calculate)
+
+    Returns:
+        Tidy DataFrame with one column per parameter and sample_size
+        (NaN where the solver found no solution)
+    """
+    names = list(grid)
+    points = [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+    cache = _load_cache(cache_path)
+    solved = cache['points']
+    missing = [params for params in points if _point_key(name, params) not in solved]
+    if missing and calculate_batch is not None:
+        batch = calculate_batch(pd.DataFrame(missing, columns=names))
+        for params, sample_size in zip(missing, batch):
+            if not np.isnan(sample_size):
+                solved[_point_key(name, params)] = sample_size
+    for params in missing:
+        if _point_key(name, params) in solved:
+            continue
+        try:
+            solved[_point_key(name, params)] = calculate(**params)
+        except (ValueError, ArithmeticError):
+            solved[_point_key(name, params)] = float('nan')
+
+    if missing:
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"Could not write power cache {cache_path}: {e}")
+    print(f"Sample size grid {name}: {len(points)} points, {len(missing)} solved, "
+          f"{len(points) - len(missing)} from cache")
+
+    rows = [{**params, 'sample_size': solved[_point_key(name, params)]} for params in points]
+    return pd.DataFrame(rows, columns=names + ['sample_size'])
+
+
+def plot_sample_size_grid(table, x='effect_size'):
+    """
+    Sample size against x, one line per combination of the other parameters
+
+    Returns:
+        matplotlib Figure (show it with pyplot or save it with fig.savefig)
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    others = [column for column in table.columns if column not in (x, 'sample_size')]
+    lines = table.groupby(others, sort=True) if others else [((), table)]
+    for values, line in lines:
+        values = values if isinstance(values, tuple) else (values,)
+        label = ', '.join(f"{column}={value}" for column, value in zip(others, values))
+        line = line.sort_values(x)
+        ax.plot(line[x], line['sample_size'], marker='o', label=label or None)
+    ax.set_xlabel(x)
+    ax.set_ylabel('Required sample size per group')
+    ax.grid(linestyle='--', alpha=0.7)
+    if others:
+        ax.legend(fontsize=8)
+    fig.tight_layout()
+    return fig
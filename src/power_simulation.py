@@ -0,0 +1,179 @@
+"""
+Monte Carlo power for the paired crossover design
+
+Simulates whole experiments - every participant does one test per
+condition (N and P) with a number of items each, half of them in the order
+PN and half NP - and runs the test of the analysis (paired two-sided
+Wilcoxon signed-rank test on the accuracies) on every simulated dataset.
+All datasets of one design point are simulated and tested as arrays, and
+design points run in parallel.
+
+Run from the project root:  python src/power_simulation.py
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import expit, logit
+from scipy.stats import rankdata, wilcoxon
+
+# Simulated experiments per design point (power +- ~1 percentage point at 2000)
+N_SIMULATIONS = 2000
+
+# Default design: accuracy of the typical participant in N, differences between
+# participants and words on the logit scale, learning from the first to the second test
+DEFAULT_DESIGN = {
+    'baseline': 0.5,
+    'items': 25,
+    'sd_participant': 1.0,
+    'sd_item': 0.0,
+    'period_effect': 0.0,
+}
+
+# Up to this many participants scipy's wilcoxon enumerates all sign patterns
+# (permutation test); done here for all datasets at once with one matrix product
+EXACT_MAX_PARTICIPANTS = 13
+EXACT_BLOCK_DATASETS = 256
+
+POWER_COLUMNS = ['n', 'effect', 'power', 'se', 'simulations']
+
+
+def simulate_accuracies(n_participants, effect, n_datasets, rng, baseline=0.5, items=25,
+                        sd_participant=1.0, sd_item=0.0, period_effect=0.0):
+    """
+    Simulate accuracy_N and accuracy_P of n_datasets crossover experiments
+
+    Each participant has an ability on the logit scale (SD sd_participant);
+    P adds the shift that raises a typical participant from baseline to
+    baseline + effect, the second test adds period_effect. With sd_item > 0
+    every item gets its own difficulty, otherwise all items of a test are
+    exchangeable (binomial counts).
+
+    Returns:
+        (accuracy_N, accuracy_P): arrays of shape (n_datasets, n_participants)
+    """
+    shift = logit(np.clip(baseline + effect, 1e-6, 1 - 1e-6)) - logit(baseline)
+    ability = logit(baseline) + rng.normal(0, sd_participant, size=(n_datasets, n_participants))
+    # Alternate PN / NP: with PN the N test is the second one
+    second_N = np.arange(n_participants) % 2 == 0
+    logit_N = ability + period_effect * second_N
+    logit_P = ability + shift + period_effect * ~second_N
+
+    accuracies = []
+    for eta in (logit_N, logit_P):
+        if sd_item > 0:
+            difficulty = rng.normal(0, sd_item, size=eta.shape + (items,))
+            correct = rng.random(eta.shape + (items,)) < expit(eta[..., np.newaxis] - difficulty)
+            accuracies.append(correct.sum(axis=-1) / items)
+        else:
+            accuracies.append(rng.binomial(items, expit(eta)) / items)
+    return accuracies[0], accuracies[1]
+
+
+def exact_signed_rank_pvalues(diffs):
+    """
+    Two-sided exact Wilcoxon signed-rank p-value of every row of diffs
+
+    Zero differences are dropped and ties get mid-ranks (as in
+    scipy.stats.wilcoxon); the null distribution of R+ comes from all 2^n
+    sign patterns, evaluated for a block of rows as one matrix product.
+    """
+    n = diffs.shape[1]
+    # Zeros rank lowest, so the ranks among the non-zero |d| are the plain ranks minus the zeros
+    zeros = (diffs == 0).sum(axis=1, keepdims=True)
+    ranks = np.where(diffs != 0, rankdata(np.abs(diffs), axis=1) - zeros, 0.0)
+    observed = (ranks * (diffs > 0)).sum(axis=1)
+    signs = (np.arange(2 ** n)[:, np.newaxis] >> np.arange(n)) & 1
+
+    p_values = np.empty(len(diffs))
+    for start in range(0, len(diffs), EXACT_BLOCK_DATASETS):
+        block = slice(start, start + EXACT_BLOCK_DATASETS)
+        null = signs @ ranks[block].T  # (2^n, datasets)
+        tolerance = 1e-9 * np.maximum(1, observed[block])
+        less = (null <= observed[block] + tolerance).mean(axis=0)
+        greater = (null >= observed[block] - tolerance).mean(axis=0)
+        p_values[block] = np.minimum(1.0, 2 * np.minimum(less, greater))
+    p_values[zeros[:, 0] == n] = np.nan
+    return p_values
+
+
+def rejection_rate(accuracy_N, accuracy_P, alpha=0.05):
+    """Share of datasets (rows) where the paired Wilcoxon test rejects at alpha"""
+    if accuracy_N.shape[1] <= EXACT_MAX_PARTICIPANTS:
+        p_values = exact_signed_rank_pvalues(accuracy_N - accuracy_P)
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p_values = wilcoxon(accuracy_N, accuracy_P, axis=1).pvalue
+    # Datasets without any non-zero difference cannot reject
+    return float(np.mean(np.nan_to_num(p_values, nan=1.0) < alpha))
+
+
+def simulated_power(n_participants, effect, n_simulations=N_SIMULATIONS, alpha=0.05, seed=None, **design):
+    """
+    Power of the paired Wilcoxon test for one design point
+
+    Args:
+        n_participants: Number of participants (split evenly over PN and NP)
+        effect: Accuracy difference P - N of a typical participant (e.g. 0.1)
+        n_simulations: Number of simulated experiments
+        alpha: Significance level
+        seed: Seed or SeedSequence for the simulation
+        **design: Overrides of DEFAULT_DESIGN
+
+    Returns:
+        Dict with POWER_COLUMNS
+    """
+    rng = np.random.default_rng(seed)
+    accuracy_N, accuracy_P = simulate_accuracies(n_participants, effect, n_simulations, rng,
+                                                 **{**DEFAULT_DESIGN, **design})
+    power = rejection_rate(accuracy_N, accuracy_P, alpha)
+    return {
+        'n': n_participants,
+        'effect': effect,
+        'power': power,
+        'se': float(np.sqrt(power * (1 - power) / n_simulations)),
+        'simulations': n_simulations,
+    }
+
+
+def power_curve(sample_sizes, effects, n_simulations=N_SIMULATIONS, alpha=0.05, seed=None, workers=None,
+                **design):
+    """
+    Power over a grid of sample sizes and effect sizes, design points in parallel
+
+    Every design point gets its own child seed, so the result does not
+    depend on the number of workers.
+
+    Returns:
+        Tidy DataFrame with POWER_COLUMNS, one row per (n, effect)
+    """
+    points = [(n, effect) for effect in effects for n in sample_sizes]
+    seeds = np.random.SeedSequence(seed).spawn(len(points))
+
+    def run(job):
+        (n, effect), point_seed = job
+        return simulated_power(n, effect, n_simulations, alpha, point_seed, **design)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        rows = list(pool.map(run, zip(points, seeds)))
+    return pd.DataFrame(rows, columns=POWER_COLUMNS)
+
+
+def required_sample_size(curve, power=0.8):
+    """Smallest simulated n reaching the target power, per effect (NaN if none does)"""
+    reached = curve[curve['power'] >= power]
+    smallest = reached.groupby('effect')['n'].min()
+    return smallest.reindex(sorted(curve['effect'].unique()))
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    curve = power_curve(sample_sizes=range(10, 101, 10), effects=[0.05, 0.1, 0.15, 0.2], seed=42)
+    print(f"Simulated {len(curve)} design points x {N_SIMULATIONS} experiments "
+          f"in {time.perf_counter() - start:.1f} s")
+    print(curve.pivot(index='n', columns='effect', values='power').to_string(float_format=lambda v: f"{v:.3f}"))
+    print("Participants needed for 80% power:")
+    print(required_sample_size(curve).to_string())
@@ -0,0 +1,263 @@
+"""
+Figures of the statistical analysis
+
+Every figure is an independent job: a draw function that fills a given
+matplotlib Figure from one small input frame. The analysis script either
+shows them one by one (interactive) or renders them headless to PNG/SVG
+with render_report, in parallel and skipping figures whose input data has
+not changed since the last run.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.patches import Patch
+from matplotlib.ticker import MultipleLocator, PercentFormatter
+
+# Bump when a draw function changes, so every figure is rendered again
+FIGURES_VERSION = 1
+MANIFEST_NAME = "figures.json"
+
+# Seed for the horizontal jitter of the data points (same data -> same figure)
+JITTER_SEED = 0
+
+SHORT_USAGE = "0-15 minutes"
+CONDITION_COLORS = {'P': 'tab:orange', 'N': 'tab:blue'}
+BOX_STYLE = dict(
+    patch_artist=True,
+    boxprops=dict(facecolor='none', color='black', linewidth=1.2),
+    medianprops=dict(color='red', linewidth=2),
+    whiskerprops=dict(color='black'),
+    capprops=dict(color='black'),
+)
+
+
+def _scatter_jittered(ax, data, rng, colors=None, alpha=0.6):
+    """Overlay the individual data points of each box, with a small horizontal spread"""
+    for i, acc in enumerate(data, start=1):
+        x_jitter = rng.normal(loc=i, scale=0.05, size=len(acc))
+        ax.scatter(x_jitter, acc, c=None if colors is None else colors[i - 1],
+                   alpha=alpha, edgecolors='black', linewidth=0.5, s=50)
+
+
+def _connect_pairs(ax, left, right, x=(1, 2)):
+    """Draw a line between the two values of every participant"""
+    for a, b in zip(left, right):
+        ax.plot(list(x), [a, b], color='gray', alpha=0.6, linewidth=1)
+
+
+def _finish_accuracy_axis(ax, title):
+    ax.set_title(title)
+    ax.set_ylabel('Accuracy')
+    ax.set_ylim(0, 1)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+
+def draw_accuracy_histograms(fig, data):
+    """Histograms (with KDE) of the accuracy in each condition"""
+    import seaborn as sns
+
+    axs = fig.subplots(1, 2, sharey=True)
+    for ax, condition, label in [(axs[0], 'N', 'Non-personalized (N)'), (axs[1], 'P', 'Personalized (P)')]:
+        sns.histplot(data[f'accuracy_{condition}'], bins=10, binrange=(0, 1), kde=True, ax=ax,
+                     color=CONDITION_COLORS[condition])
+        ax.set_xlim(0, 1)
+        ax.set_title(f'Accuracy Distribution: {label}')
+        ax.set_xlabel('Accuracy')
+    axs[0].set_ylabel('Frequency')
+
+
+def draw_accuracy_by_experiment(fig, data):
+    """Bar chart of both accuracies for every session, with the mean of each condition"""
+    ax = fig.subplots()
+    width = 0.35
+    x = np.arange(len(data))
+    bars_N = ax.bar(x - width / 2, data['accuracy_N'], width, label='Non-personalized')
+    bars_P = ax.bar(x + width / 2, data['accuracy_P'], width, label='Personalized')
+    ax.bar_label(bars_N, labels=[f"{v*100:.1f}%" for v in data['accuracy_N']], padding=3, fontsize=7)
+    ax.bar_label(bars_P, labels=[f"{v*100:.1f}%" for v in data['accuracy_P']], padding=3, fontsize=7)
+
+    avg_N = data['accuracy_N'].mean()
+    avg_P = data['accuracy_P'].mean()
+    ax.axhline(avg_N, color='blue', linestyle='--', linewidth=1, label=f'Mean Non-personalized {avg_N*100:.1f}%')
+    ax.axhline(avg_P, color='orange', linestyle='--', linewidth=1, label=f'Mean Personalized {avg_P*100:.1f}%')
+
+    ax.set_xlabel('Experiment ID')
+    ax.set_ylabel('Accuracy')
+    ax.set_title('Accuracy by Condition')
+    ax.set_xticks(x)
+    ax.set_xticklabels(data['id'], rotation=45, ha='right')
+    ax.legend()
+    ax.set_ylim(0, 1)
+    ax.yaxis.set_major_formatter(PercentFormatter(1.0))
+    ax.yaxis.set_major_locator(MultipleLocator(0.1))
+
+
+def draw_paired_conditions(fig, data):
+    """Box plot of N vs P with lines connecting the two accuracies of each participant"""
+    ax = fig.subplots()
+    boxes = [data['accuracy_N'], data['accuracy_P']]
+    ax.boxplot(boxes, tick_labels=['Non-personalized (N)', 'Personalized (P)'], **BOX_STYLE)
+    _scatter_jittered(ax, boxes, np.random.default_rng(JITTER_SEED))
+    _connect_pairs(ax, data['accuracy_N'], data['accuracy_P'])
+    _finish_accuracy_axis(ax, 'Paired Accuracy Comparison: Personalized vs Non-personalized')
+
+
+def draw_paired_tests(fig, data):
+    """Box plot of the first vs the second test, whatever the condition"""
+    ax = fig.subplots()
+    boxes = [data['accuracy_first'], data['accuracy_second']]
+    ax.boxplot(boxes, tick_labels=['First Test', 'Second Test'], **BOX_STYLE)
+    _scatter_jittered(ax, boxes, np.random.default_rng(JITTER_SEED))
+    _connect_pairs(ax, data['accuracy_first'], data['accuracy_second'])
+    _finish_accuracy_axis(ax, 'Paired Accuracy Comparison: First Test vs Second Test')
+
+
+def draw_paired_tests_by_condition(fig, data):
+    """First vs second test with the points colored by condition (P orange, N blue)"""
+    ax = fig.subplots()
+    boxes = [data['accuracy_first'], data['accuracy_second']]
+    colors = [data['condition_first'].map(CONDITION_COLORS).tolist(),
+              data['condition_second'].map(CONDITION_COLORS).tolist()]
+    ax.boxplot(boxes, tick_labels=['First Test', 'Second Test'], **BOX_STYLE)
+    _scatter_jittered(ax, boxes, np.random.default_rng(JITTER_SEED), colors=colors, alpha=0.7)
+    _connect_pairs(ax, data['accuracy_first'], data['accuracy_second'])
+    ax.legend(handles=[Patch(color=CONDITION_COLORS['P'], label='P'),
+                       Patch(color=CONDITION_COLORS['N'], label='N')], loc='upper right')
+    _finish_accuracy_axis(ax, 'Paired Accuracy Comparison: First Test vs Second Test')
+
+
+def draw_youtube_bands(fig, data):
+    """N vs P for short (0-15 min) and long (> 15 min) YouTube usage side by side"""
+    ax = fig.subplots()
+    short = data[data['youtube_usage'] == SHORT_USAGE]
+    long = data[data['youtube_usage'] != SHORT_USAGE]
+    boxes = [short['accuracy_N'], short['accuracy_P'], long['accuracy_N'], long['accuracy_P']]
+    ax.boxplot(boxes, tick_labels=['Non-personalized', 'Personalized', 'Non-personalized', 'Personalized'],
+               widths=0.25, **BOX_STYLE)
+    colors = [CONDITION_COLORS['N'], CONDITION_COLORS['P']] * 2
+    _scatter_jittered(ax, boxes, np.random.default_rng(JITTER_SEED), colors=colors)
+    _connect_pairs(ax, short['accuracy_N'], short['accuracy_P'], x=(1, 2))
+    _connect_pairs(ax, long['accuracy_N'], long['accuracy_P'], x=(3, 4))
+
+    ax.axvline(2.5, color='black', linestyle='--', linewidth=1)
+    ax.text(1.5, ax.get_ylim()[0] - 0.15, 'Short (0-15 min)', ha='center', va='center', fontsize=11)
+    ax.text(3.5, ax.get_ylim()[0] - 0.15, 'Long (>15 min)', ha='center', va='center', fontsize=11)
+    _finish_accuracy_axis(ax, 'Accuracy comparison by YouTube Shorts usage')
+
+
+# name -> (draw function, figure size, input columns of the per-session results)
+FIGURES = {
+    'accuracy_histograms': (draw_accuracy_histograms, (12, 5), ['accuracy_N', 'accuracy_P']),
+    'accuracy_by_experiment': (draw_accuracy_by_experiment, (10, 6), ['id', 'accuracy_N', 'accuracy_P']),
+    'paired_conditions': (draw_paired_conditions, (6, 6), ['accuracy_N', 'accuracy_P']),
+    'paired_tests': (draw_paired_tests, (6, 6), ['accuracy_first', 'accuracy_second']),
+    'paired_tests_by_condition': (draw_paired_tests_by_condition, (6, 6),
+                                  ['accuracy_first', 'accuracy_second', 'condition_first', 'condition_second']),
+    'youtube_bands': (draw_youtube_bands, (8, 6), ['youtube_usage', 'accuracy_N', 'accuracy_P']),
+}
+
+
+def figure_inputs(results):
+    """Input frame of every figure: only the columns it draws"""
+    return {name: results[columns].reset_index(drop=True) for name, (_, _, columns) in FIGURES.items()}
+
+
+def input_digest(data):
+    """Hash of a figure's input data (values, columns and dtypes)"""
+    digest = hashlib.sha256(f"{FIGURES_VERSION}|{list(data.columns)}|{list(map(str, data.dtypes))}".encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def show_figures(results):
+    """Show every figure interactively, one after the other"""
+    import matplotlib.pyplot as plt
+
+    for name, data in figure_inputs(results).items():
+        draw, figsize, _ = FIGURES[name]
+        fig = plt.figure(figsize=figsize)
+        draw(fig, data)
+        fig.tight_layout()
+        plt.show()
+
+
+def render_figure(name, data, output_dir, formats):
+    """Draw one figure on a fresh Agg figure and save it in every format; returns the file paths"""
+    draw, figsize, _ = FIGURES[name]
+    fig = Figure(figsize=figsize)
+    draw(fig, data)
+    fig.tight_layout()
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt)
+        paths.append(path)
+    return paths
+
+
+def _executor(workers):
+    """Process pool where processes can be forked, otherwise threads
+
+    Spawned processes (Windows) would re-run the importing analysis script
+    in every worker, so there the figures are drawn on threads instead.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def render_report(results, output_dir="report", formats=('png', 'svg'), workers=None, force=False):
+    """
+    Render every figure headless to output_dir, in parallel
+
+    A figure is skipped when its input data has the same digest as in the
+    last run (stored in output_dir/figures.json) and all its files exist.
+
+    Args:
+        results: Per-session results (with the test order columns)
+        output_dir: Directory for the figure files and the manifest
+        formats: File formats to save, e.g. ('png', 'svg')
+        workers: Number of parallel render jobs (default: number of CPUs)
+        force: Render every figure even if its input is unchanged
+
+    Returns:
+        Dict name -> 'rendered' or 'unchanged'
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    status = {}
+    jobs = {}
+    for name, data in figure_inputs(results).items():
+        digest = input_digest(data)
+        files_exist = all(os.path.exists(os.path.join(output_dir, f"{name}.{fmt}")) for fmt in formats)
+        if not force and manifest.get(name) == digest and files_exist:
+            status[name] = 'unchanged'
+        else:
+            jobs[name] = (data, digest)
+
+    if jobs:
+        workers = min(len(jobs), workers or os.cpu_count() or 1)
+        with _executor(workers) as pool:
+            futures = {name: pool.submit(render_figure, name, data, output_dir, formats)
+                       for name, (data, _) in jobs.items()}
+            for name, future in futures.items():
+                future.result()
+                manifest[name] = jobs[name][1]
+                status[name] = 'rendered'
+
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return {name: status[name] for name in FIGURES}
@@ -0,0 +1,198 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Upper bound for one block of resampled values (float64), keeps 100k replicates in bounded memory
+MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Enumerate all 2^m sign patterns up to this many non-zero differences, otherwise Monte Carlo
+EXACT_MAX_PAIRS = 22
+
+# Monte Carlo sign flips per batch
+PERMUTATION_BATCH = 20000
+
+# Stop once the p-value is this many standard errors away from alpha
+EARLY_STOP_Z = 3.29
+
+STATISTICS = {
+    'mean': lambda samples: samples.mean(axis=1),
+    'median': lambda samples: np.median(samples, axis=1),
+}
+
+
+def chunk_sizes(total, per_row_bytes, max_block_bytes=MAX_BLOCK_BYTES):
+    """Split total rows into chunks whose (rows x per_row_bytes) stays under max_block_bytes"""
+    rows = max(1, int(max_block_bytes // max(per_row_bytes, 1)))
+    full, rest = divmod(total, rows)
+    return [rows] * full + ([rest] if rest else [])
+
+
+def bootstrap_distribution(values, statistic='mean', n_resamples=10000, seed=None,
+                           max_block_bytes=MAX_BLOCK_BYTES):
+    """
+    Bootstrap distribution of a statistic, drawing each block of resamples as one index matrix
+
+    Args:
+        values: 1-D array of observations (e.g. paired differences accuracy_P - accuracy_N)
+        statistic: 'mean' or 'median'
+        n_resamples: Number of bootstrap replicates
+        seed: Seed for the random generator (same seed -> same replicates)
+        max_block_bytes: Memory bound for one block of resampled values
+
+    Returns:
+        Array with n_resamples values of the statistic
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    rng = np.random.default_rng(seed)
+    stat = STATISTICS[statistic]
+
+    replicates = np.empty(n_resamples)
+    start = 0
+    for rows in chunk_sizes(n_resamples, n * 8, max_block_bytes):
+        indices = rng.integers(0, n, size=(rows, n))
+        replicates[start:start + rows] = stat(values[indices])
+        start += rows
+    return replicates
+
+
+def bootstrap_ci(values, statistic='mean', n_resamples=10000, confidence=0.95, seed=None,
+                 max_block_bytes=MAX_BLOCK_BYTES):
+    """
+    Percentile bootstrap confidence interval
+
+    Returns:
+        Dict with n, estimate, ci_low and ci_high
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {'n': 0, 'estimate': np.nan, 'ci_low': np.nan, 'ci_high': np.nan}
+
+    replicates = bootstrap_distribution(values, statistic, n_resamples, seed, max_block_bytes)
+    alpha = 1 - confidence
+    low, high = np.quantile(replicates, [alpha / 2, 1 - alpha / 2])
+    return {
+        'n': len(values),
+        'estimate': float(STATISTICS[statistic](values[np.newaxis, :])[0]),
+        'ci_low': float(low),
+        'ci_high': float(high),
+    }
+
+
+def bootstrap_table(results, value_col, group_col=None, statistics=('mean', 'median'),
+                    n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Bootstrap CIs for the whole sample and (optionally) for every group
+
+    Args:
+        results: Per-session results
+        value_col: Column to bootstrap (e.g. 'diff_PN')
+        group_col: Optional column to split by (e.g. 'youtube_usage')
+
+    Returns:
+        Tidy DataFrame with group, statistic, n, estimate, ci_low, ci_high
+    """
+    groups = [('All', results[value_col])]
+    if group_col is not None:
+        groups += [(name, group[value_col]) for name, group in results.groupby(group_col, observed=True)]
+
+    rows = []
+    for name, values in groups:
+        for statistic in statistics:
+            ci = bootstrap_ci(values, statistic, n_resamples, confidence, seed)
+            rows.append({'group': name, 'statistic': statistic, **ci})
+    return pd.DataFrame(rows, columns=['group', 'statistic', 'n', 'estimate', 'ci_low', 'ci_high'])
+
+
+def _count_extreme_exact(abs_diffs, observed, start, stop):
+    """Count sign patterns start..stop-1 (as bit masks) whose |sum| reaches the observed |sum|"""
+    patterns = np.arange(start, stop, dtype=np.int64)[:, np.newaxis]
+    bits = (patterns >> np.arange(len(abs_diffs))) & 1
+    sums = (1 - 2 * bits) @ abs_diffs
+    return int(np.count_nonzero(np.abs(sums) >= observed))
+
+
+def _count_extreme_random(abs_diffs, observed, rows, seed):
+    """Count random sign flips whose |sum| reaches the observed |sum|"""
+    rng = np.random.default_rng(seed)
+    signs = rng.choice(np.array([-1.0, 1.0]), size=(rows, len(abs_diffs)))
+    sums = signs @ abs_diffs
+    return int(np.count_nonzero(np.abs(sums) >= observed))
+
+
+def paired_permutation_test(diffs, n_permutations=100000, alpha=0.05, seed=None, workers=None,
+                            early_stop=True):
+    """
+    Two-sided sign-flip permutation test for paired differences (H0: symmetric around 0)
+
+    With at most EXACT_MAX_PAIRS non-zero differences all 2^m sign patterns
+    are enumerated (exact p-value). Otherwise batches of random sign-flip
+    matrices are evaluated; with early_stop the batches stop as soon as
+    the p-value is clearly above or below alpha. The stop rule is checked
+    per batch, so a seed gives the same result on any number of workers.
+
+    The batches run on a thread pool: the matrix products release the GIL,
+    and unlike a process pool this does not re-run the analysis script in
+    every worker on Windows.
+
+    Args:
+        diffs: Paired differences, e.g. accuracy_P - accuracy_N
+        n_permutations: Maximum number of Monte Carlo sign flips
+        alpha: Significance level used for early stopping
+        seed: Seed for the Monte Carlo sign flips
+        workers: Number of threads (default: number of CPUs)
+        early_stop: Stop Monte Carlo sampling once the decision at alpha is resolved
+
+    Returns:
+        Dict with n, statistic (mean difference), p_value, method and permutations used
+    """
+    diffs = np.asarray(diffs, dtype=float)
+    diffs = diffs[~np.isnan(diffs)]
+    abs_diffs = np.abs(diffs[diffs != 0])  # zero differences do not change under a sign flip
+    m = len(abs_diffs)
+    observed = abs(diffs.sum()) - 1e-12  # tolerance for floating point ties
+    workers = workers or os.cpu_count() or 1
+    result = {'n': len(diffs), 'statistic': float(diffs.mean()) if len(diffs) else np.nan}
+
+    if m == 0:
+        return {**result, 'p_value': 1.0, 'method': 'exact', 'permutations': 1}
+
+    if m <= EXACT_MAX_PAIRS:
+        total = 2 ** m
+        bounds = np.linspace(0, total, min(workers, total) + 1, dtype=np.int64)
+        # Keep each block of the sign matrix small
+        step = max(1, MAX_BLOCK_BYTES // (m * 8))
+        blocks = [(start, min(start + step, stop))
+                  for lo, stop in zip(bounds[:-1], bounds[1:]) for start in range(lo, stop, step)]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            extreme = sum(pool.map(lambda block: _count_extreme_exact(abs_diffs, observed, *block), blocks))
+        return {**result, 'p_value': extreme / total, 'method': 'exact', 'permutations': total}
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_permutations // PERMUTATION_BATCH))
+    batch_rows = [PERMUTATION_BATCH] * len(seeds)
+    batch_rows[-1] = n_permutations - PERMUTATION_BATCH * (len(seeds) - 1)
+
+    extreme = 0
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for wave in range(0, len(seeds), workers):
+            jobs = list(zip(batch_rows[wave:wave + workers], seeds[wave:wave + workers]))
+            counts = pool.map(lambda job: _count_extreme_random(abs_diffs, observed, *job), jobs)
+            # The stop rule is checked after every batch in batch order, so the same seed gives
+            # the same result with any number of workers (batches past the stop are dropped)
+            stopped = False
+            for (rows, _), count in zip(jobs, counts):
+                extreme += count
+                done += rows
+                p_value = (extreme + 1) / (done + 1)
+                standard_error = np.sqrt(p_value * (1 - p_value) / done)
+                if early_stop and abs(p_value - alpha) > EARLY_STOP_Z * standard_error:
+                    stopped = True
+                    break
+            if stopped:
+                break
+
+    return {**result, 'p_value': (extreme + 1) / (done + 1), 'method': 'monte carlo', 'permutations': done}
@@ -0,0 +1,87 @@
+def score_answers(first_phase_words, first_answers, second_phase_words, second_answers, csv_file=None,
+                  max_edits=0):
+    """
+    Score both tests from the in-memory answer dicts in one vectorized pass
+
+    Args:
+        first_phase_words: DataFrame (word_id, ice, eng) shown in the first test
+        first_answers: Dict word_id -> answer from the first test screen
+        second_phase_words: DataFrame (word_id, ice, eng) shown in the second test
+        second_answers: Dict word_id -> answer from the second test screen
+        csv_file: Session CSV file, only used for display
+        max_edits: Accept typos within this many edits as correct (0 = exact only)
+
+    Returns:
+        Dictionary in the format used by the final completion screen
+    """
+    import pandas as pd
+
+    # One frame with both tests: test 0 and test 1
+    trials = pd.concat([
+        first_phase_words[['word_id', 'ice', 'eng']].assign(
+            test_id=0, answer_raw=first_phase_words['word_id'].map(first_answers or {})),
+        second_phase_words[['word_id', 'ice', 'eng']].assign(
+            test_id=1, answer_raw=second_phase_words['word_id'].map(second_answers or {})),
+    ], ignore_index=True)
+
+    return results_from_trials(trials, csv_file, max_edits)
+
+
+def results_from_trials(trials, csv_file=None, max_edits=0):
+    """
+    Turn trial rows (test_id, word_id, ice, eng, answer_raw) into the results dictionary
+
+    Missing answers, empty answers and 'none' all count as no answer.
+    """
+    from scoring import classify_answers
+
+    classified = classify_answers(trials['answer_raw'], trials['eng'], max_edits)
+    classified.index = trials.index
+    answer_display = trials['answer_raw'].fillna('').astype(str).str.strip()
+
+    trials = trials.assign(
+        answer=answer_display.where(~classified['is_empty'], '(no answer)'),
+        correct=classified['is_correct'],
+        is_empty=classified['is_empty'],
+        incorrect=classified['is_incorrect']
+    )
+    counts = trials.groupby('test_id')[['correct', 'incorrect', 'is_empty']].sum().reindex([0, 1], fill_value=0)
+
+    first_correct, first_incorrect, first_no_answer = (int(v) for v in counts.loc[0])
+    second_correct, second_incorrect, second_no_answer = (int(v) for v in counts.loc[1])
+
+    # Always use 25 as the total for each test (this is how many words are tested)
+    first_total = 25
+    second_total = 25
+
+    first_percentage = (first_correct / first_total * 100) if first_total > 0 else 0
+    second_percentage = (second_correct / second_total * 100) if second_total > 0 else 0
+    total_correct = first_correct + second_correct
+    total_incorrect = first_incorrect + second_incorrect
+    total_no_answer = first_no_answer + second_no_answer
+    overall_percentage = (total_correct / 50 * 100)  # Out of 50 total (25+25)
+
+    detail_columns = ['ice', 'eng', 'answer', 'correct', 'is_empty']
+    first_details = trials.loc[trials['test_id'] == 0, detail_columns].to_dict('records')
+    second_details = trials.loc[trials['test_id'] == 1, detail_columns].to_dict('records')
+
+    return {
+        'first_correct': first_correct,
+        'first_incorrect': first_incorrect,
+        'first_no_answer': first_no_answer,
+        'first_total': first_total,
+        'first_percentage': first_percentage,
+        'second_correct': second_correct,
+        'second_incorrect': second_incorrect,
+        'second_no_answer': second_no_answer,
+        'second_total': second_total,
+        'second_percentage': second_percentage,
+        'total_correct': total_correct,
+        'total_incorrect': total_incorrect,
+        'total_no_answer': total_no_answer,
+        'total_answered': 50,  # Always 50 (25 + 25)
+        'overall_percentage': overall_percentage,
+        'first_details': first_details,
+        'second_details': second_details,
+        'csv_file': csv_file
+    }
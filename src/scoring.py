@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+# Answers that count as "no answer" after normalization
+NO_ANSWER_TOKENS = ['', 'none']
+
+OUTCOMES = ['correct', 'incorrect', 'no_answer']
+
+
+def normalize(values):
+    """Stripped, lower-case strings; missing values become ''"""
+    return pd.Series(values).fillna('').astype(str).str.strip().str.lower()
+
+
+def bounded_edit_distance(a, b, max_edits):
+    """
+    Levenshtein distance between a and b, or max_edits + 1 if it is larger
+
+    Bit-parallel (Myers/Hyyro) over the characters of a, so each character
+    of b costs a handful of integer operations regardless of word length.
+    Stops early once the distance can no longer come back under max_edits.
+    """
+    if a == b:
+        return 0
+    m, n = len(a), len(b)
+    if abs(m - n) > max_edits:
+        return max_edits + 1
+    if m == 0 or n == 0:
+        return max(m, n)
+
+    # Bit mask of the positions of every character in a
+    peq = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    all_bits = (1 << m) - 1
+    last_bit = 1 << (m - 1)
+    pv, mv = all_bits, 0
+    score = m
+    for j, ch in enumerate(b):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & all_bits) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & all_bits
+        mh = pv & xh
+        if ph & last_bit:
+            score += 1
+        elif mh & last_bit:
+            score -= 1
+        # Every remaining character of b can lower the distance by at most one
+        if score - (n - j - 1) > max_edits:
+            return max_edits + 1
+        ph = ((ph << 1) | 1) & all_bits
+        mh = (mh << 1) & all_bits
+        pv = (mh | ~(xv | ph)) & all_bits
+        mv = ph & xv
+    return score if score <= max_edits else max_edits + 1
+
+
+def classify_answers(answers, targets, max_edits=0):
+    """
+    Classify answers against the correct translations, element-wise
+
+    Args:
+        answers: Series/array of given answers (NaN, '' and 'none' mean no answer)
+        targets: Series/array of correct English words, same length
+        max_edits: Lenient mode - answers within this many edits (typos) count
+            as correct; 0 means exact match only
+
+    Returns:
+        DataFrame with is_empty, is_correct, is_typo and is_incorrect boolean
+        columns and an outcome column ('correct', 'incorrect' or 'no_answer')
+    """
+    answers = normalize(answers)
+    targets = normalize(targets).to_numpy()
+    answer_values = answers.to_numpy()
+
+    is_empty = answers.isin(NO_ANSWER_TOKENS).to_numpy()
+    is_exact = ~is_empty & (answer_values == targets)
+
+    # Lenient mode: edit distance only for the wrong answers, once per distinct pair
+    is_typo = np.zeros(len(answers), dtype=bool)
+    if max_edits > 0:
+        candidates = np.flatnonzero(~is_empty & ~is_exact)
+        distances = {}
+        for i in candidates:
+            pair = (answer_values[i], targets[i])
+            if pair not in distances:
+                distances[pair] = bounded_edit_distance(pair[0], pair[1], max_edits)
+            is_typo[i] = distances[pair] <= max_edits
+
+    is_correct = is_exact | is_typo
+    is_incorrect = ~is_empty & ~is_correct
+
+    outcome = np.select([is_correct, is_incorrect], OUTCOMES[:2], default=OUTCOMES[2])
+    return pd.DataFrame({
+        'is_empty': is_empty,
+        'is_correct': is_correct,
+        'is_typo': is_typo,
+        'is_incorrect': is_incorrect,
+        'outcome': pd.Categorical(outcome, categories=OUTCOMES),
+    }, index=answers.index)
+
+
+def score_trials(df, answer_col='answer', target_col='eng', max_edits=0):
+    """
+    Score trial rows in one vectorized pass
+
+    Args:
+        df: Trial rows (one session or the whole archive)
+        answer_col: Column with the given answers
+        target_col: Column with the correct translations
+        max_edits: Accept typos within this many edits as correct (0 = exact only)
+
+    Returns:
+        Copy of df with 'correct' (0/1), 'no_answer' and 'typo' (bool) and 'outcome' columns
+    """
+    answers = df[answer_col] if answer_col in df.columns else pd.Series(np.nan, index=df.index)
+    classified = classify_answers(answers, df[target_col], max_edits)
+    classified.index = df.index
+    return df.assign(
+        correct=classified['is_correct'].astype(int),
+        no_answer=classified['is_empty'],
+        typo=classified['is_typo'],
+        outcome=classified['outcome']
+    )
+
+
+def rescore_archive(data_dir="data", max_edits=0):
+    """Load every session file in data_dir and score all trials with one call"""
+    from analysis_data import load_trials
+
+    return score_trials(load_trials(data_dir), max_edits=max_edits)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    # Optional argument: number of edits to accept (lenient scoring)
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    start = time.perf_counter()
+    scored = rescore_archive(max_edits=edits)
+    print(f"Scored {len(scored)} trials in {time.perf_counter() - start:.3f} s (max_edits={edits})")
+    print(scored.groupby(['id', 'condition'], observed=True)['correct'].mean().unstack())
@@ -0,0 +1,58 @@
+import tkinter as tk
+
+
+class ScreenManager:
+    """
+    Keeps every screen of the experiment as a frame that is built once
+
+    A screen is built the first time it is needed (or ahead of time with
+    prepare, e.g. while the participant is on the previous screen) and
+    switching screens only packs the new frame and unpacks the old one, so
+    the window never shows a half-built or empty tree in between.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.container = tk.Frame(root, bg='white')
+        self.container.pack(fill=tk.BOTH, expand=True)
+        self.screens = {}  # name -> (frame, whatever the build function returned)
+        self.current = None
+
+    def prepare(self, name, build):
+        """
+        Build the screen if it does not exist yet, without showing it
+
+        Args:
+            name: Name of the screen
+            build: Function taking the (empty) screen frame and filling it;
+                its return value (e.g. the widgets updated later) is kept
+
+        Returns:
+            The return value of build
+        """
+        if name not in self.screens:
+            frame = tk.Frame(self.container, bg='white')
+            self.screens[name] = (frame, build(frame))
+        return self.screens[name][1]
+
+    def show(self, name, build):
+        """Show the screen (building it first if needed) and hide the current one"""
+        widgets = self.prepare(name, build)
+        if self.current != name:
+            if self.current in self.screens:
+                self.screens[self.current][0].pack_forget()
+            self.screens[name][0].pack(fill=tk.BOTH, expand=True)
+            self.current = name
+        return widgets
+
+    def prepare_later(self, name, build):
+        """Build the screen once the event loop is idle"""
+        self.root.after_idle(lambda: self.prepare(name, build))
+
+    def discard(self, name):
+        """Destroy a screen, e.g. one whose content is no longer valid"""
+        if name in self.screens:
+            frame, _ = self.screens.pop(name)
+            frame.destroy()
+            if self.current == name:
+                self.current = None
@@ -0,0 +1,37 @@
+import glob
+import os
+
+
+def find_session_file(unique_id, data_dir="data"):
+    """
+    Find the newest CSV for a session by scanning the data directory
+
+    This is the slow path (it lists the directory) and is only used when the
+    session was not registered, e.g. when resuming after a crash.
+    """
+    matches = glob.glob(os.path.join(glob.escape(data_dir), f"experiment_{glob.escape(unique_id)}_*.csv"))
+    if not matches:
+        return None
+    return sorted(matches)[-1]
+
+
+class SessionRegistry:
+    """Keeps track of which CSV file belongs to which session id"""
+
+    def __init__(self, data_dir="data"):
+        self.data_dir = data_dir
+        self.paths = {}  # unique_id -> path of the session CSV
+
+    def register(self, unique_id, path):
+        """Remember the CSV file created for a session"""
+        self.paths[unique_id] = path
+
+    def resolve(self, unique_id):
+        """Return the CSV path for a session (constant time once registered)"""
+        path = self.paths.get(unique_id)
+        if path is None:
+            path = find_session_file(unique_id, self.data_dir)
+            if path is not None:
+                print(f"Session {unique_id} was not registered, found {path} by scanning {self.data_dir}")
+                self.paths[unique_id] = path
+        return path
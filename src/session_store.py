@@ -0,0 +1,240 @@
+import csv
+import glob
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.path.join("data", "experiments.sqlite")
+
+# Column order of the per-session CSV files
+CSV_COLUMNS = ['id', 'word_id', 'ice', 'eng', 'answer', 'test_id', 'condition', 'knows_icelandic', 'youtube_usage']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT NOT NULL,
+    created_at TEXT,
+    knows_icelandic TEXT,
+    youtube_usage TEXT,
+    csv_file TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_id ON sessions (id);
+
+CREATE TABLE IF NOT EXISTS trials (
+    id TEXT NOT NULL,
+    test_id INTEGER NOT NULL,
+    word_id INTEGER NOT NULL,
+    ice TEXT,
+    eng TEXT,
+    condition TEXT,
+    position INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trials_key ON trials (id, test_id, word_id);
+
+CREATE TABLE IF NOT EXISTS answers (
+    id TEXT NOT NULL,
+    test_id INTEGER NOT NULL,
+    word_id INTEGER NOT NULL,
+    answer TEXT,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_answers_key ON answers (id, test_id, word_id);
+"""
+
+# Trials joined with their answers and session info, in the CSV layout
+TRIALS_QUERY = """
+SELECT t.id, t.word_id, t.ice, t.eng, a.answer, t.test_id, t.condition,
+       s.knows_icelandic, s.youtube_usage
+FROM trials t
+JOIN sessions s ON s.id = t.id
+LEFT JOIN answers a ON a.id = t.id AND a.test_id = t.test_id AND a.word_id = t.word_id
+"""
+
+
+class SQLiteSessionStore:
+    """Optional SQLite (WAL mode) backend holding sessions, trials and answers"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        """
+        Open (or create) the session database
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path)
+        # WAL lets the analysis read while an experiment is writing
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def create_session(self, unique_id, trial_rows, knows_icelandic='', youtube_usage='', csv_file=None):
+        """
+        Insert a session and its trials
+
+        Args:
+            unique_id: Session identifier
+            trial_rows: Iterable of (test_id, word_id, ice, eng, condition) tuples
+            knows_icelandic: Answer to the Icelandic question
+            youtube_usage: YouTube Shorts usage band
+            csv_file: CSV file the session is exported to (optional)
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, created_at, knows_icelandic, youtube_usage, csv_file) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (unique_id, datetime.now().isoformat(), knows_icelandic, youtube_usage, csv_file)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO trials (id, test_id, word_id, ice, eng, condition, position) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(unique_id, int(test_id), int(word_id), ice, eng, condition, position)
+                 for position, (test_id, word_id, ice, eng, condition) in enumerate(trial_rows)]
+            )
+
+    def record_answer(self, unique_id, test_id, word_id, answer):
+        """Point write of a single answer (uses the (id, test_id, word_id) index)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO answers (id, test_id, word_id, answer, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id, test_id, word_id) DO UPDATE SET answer = excluded.answer, "
+                "updated_at = excluded.updated_at",
+                (unique_id, int(test_id), int(word_id), answer, datetime.now().isoformat())
+            )
+
+    def mark_finished(self, unique_id, test_id):
+        """Store 'none' for every unanswered word of a finished test"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO answers (id, test_id, word_id, answer, updated_at) "
+                "SELECT id, test_id, word_id, 'none', ? FROM trials WHERE id = ? AND test_id = ?",
+                (datetime.now().isoformat(), unique_id, int(test_id))
+            )
+
+    def load_trials(self, session_ids=None):
+        """
+        Load trials in the CSV layout with a single SQL query
+
+        Args:
+            session_ids: Only load these sessions (default: all)
+
+        Returns:
+            DataFrame with the same columns as the per-session CSV files
+        """
+        import pandas as pd
+
+        query = TRIALS_QUERY
+        params = []
+        if session_ids is not None:
+            session_ids = list(session_ids)
+            query += f" WHERE t.id IN ({', '.join('?' * len(session_ids))})"
+            params = session_ids
+        query += " ORDER BY t.id, t.test_id, t.position"
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def export_csv(self, unique_id, csv_path):
+        """
+        Write one session to a CSV file in the usual per-session layout
+
+        Reads through its own connection, so the export can run on a worker
+        thread while the experiment keeps writing (WAL).
+        """
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute(
+                TRIALS_QUERY + " WHERE t.id = ? ORDER BY t.test_id, t.position", (unique_id,)
+            ).fetchall()
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(rows)
+        print(f"✓ Session {unique_id} exported to {csv_path}")
+        return csv_path
+
+    def import_csv(self, csv_path):
+        """
+        Import a per-session CSV file (e.g. from another lab) into the database
+
+        Returns:
+            True if the file was imported, False if it has an unsupported layout
+        """
+        import pandas as pd
+
+        df = pd.read_csv(csv_path, dtype={'id': str})
+        if 'test_id' not in df.columns or df.empty:
+            print(f"Skipping {csv_path}: not in the current session layout")
+            return False
+
+        unique_id = str(df['id'].iloc[0])
+        first = df.iloc[0]
+        self.create_session(
+            unique_id,
+            zip(df['test_id'], df['word_id'], df['ice'], df['eng'], df['condition']),
+            knows_icelandic=None if pd.isna(first.get('knows_icelandic')) else first.get('knows_icelandic'),
+            youtube_usage=None if pd.isna(first.get('youtube_usage')) else first.get('youtube_usage'),
+            csv_file=csv_path
+        )
+        answered = df[df['answer'].notna()]
+        now = datetime.now().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO answers (id, test_id, word_id, answer, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(unique_id, int(t), int(w), str(a), now)
+                 for t, w, a in zip(answered['test_id'], answered['word_id'], answered['answer'])]
+            )
+        return True
+
+    def session_writer(self, unique_id, csv_path=None):
+        """Per-session writer with the same interface as AnswerJournal"""
+        return SQLiteSessionWriter(self, unique_id, csv_path)
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
+class SQLiteSessionWriter:
+    """Records the answers of one session in the SQLite store (drop-in for AnswerJournal)"""
+
+    def __init__(self, store, unique_id, csv_path=None):
+        self.store = store
+        self.unique_id = unique_id
+        self.csv_path = csv_path
+        self.journal_path = store.db_path
+        self.last_answers = {}  # (test_id, word_id) -> last answer written
+
+    def record(self, test_id, word_id, answer):
+        """Write an answer change; repeated identical answers are not written again"""
+        key = (int(test_id), int(word_id))
+        if self.last_answers.get(key) == answer:
+            return
+        self.last_answers[key] = answer
+        self.store.record_answer(self.unique_id, key[0], key[1], answer)
+
+    def mark_finished(self, test_id):
+        """Record that a test is over, so its unanswered words count as 'none'"""
+        self.store.mark_finished(self.unique_id, test_id)
+
+    def flush(self):
+        """Every write is already committed, nothing to do"""
+
+    def compact(self):
+        """Export the session to its CSV file so the CSV layout stays available"""
+        if self.csv_path:
+            return self.store.export_csv(self.unique_id, self.csv_path)
+        return None
+
+    def close(self):
+        """The store owns the connection, nothing to close here"""
+
+
+if __name__ == "__main__":
+    # Import every session CSV in data/ (e.g. merged from several labs) into the database
+    store = SQLiteSessionStore()
+    imported = sum(store.import_csv(f) for f in sorted(glob.glob(os.path.join("data", "*.csv"))))
+    print(f"Imported {imported} sessions into {store.db_path}")
+    store.close()
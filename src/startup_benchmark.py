@@ -0,0 +1,82 @@
+"""
+Startup benchmark for the experiment app
+
+Starts the app in fresh Python processes, measures the time from process
+start until the welcome screen has been drawn (time-to-first-frame) and
+exits with an error if the median goes over the budget, or if importing
+main.py already pulls in the heavy analysis libraries.
+
+Run from the project root:  python src/startup_benchmark.py
+(needs a display, like the experiment itself)
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+# Time-to-first-frame budget in seconds (median over RUNS fresh processes)
+STARTUP_BUDGET_SECONDS = 1.0
+RUNS = 5
+
+# Modules that must not be imported before the first frame
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl']
+
+PROBE = """
+import time
+start = time.perf_counter()
+import json, sys
+sys.path.insert(0, 'src')
+import main
+heavy_on_import = [m for m in {heavy!r} if m in sys.modules]
+root = main.tk.Tk()
+app = main.ExperimentApp(root)
+root.update()
+first_frame = time.perf_counter() - start
+root.destroy()
+print(json.dumps({{'first_frame': first_frame, 'heavy_on_import': heavy_on_import}}))
+"""
+
+
+def measure_once():
+    """Start the app in a new process and return its measurements"""
+    process = subprocess.run(
+        [sys.executable, '-c', PROBE.format(heavy=HEAVY_MODULES)],
+        capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        # e.g. no display available
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    # The app prints its own log lines, the measurement is the last line
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def main():
+    try:
+        measurements = [measure_once() for _ in range(RUNS)]
+    except RuntimeError as e:
+        print(f"Could not start the app: {e}")
+        return 2
+
+    first_frames = [m['first_frame'] for m in measurements]
+    median = statistics.median(first_frames)
+
+    print(f"Time to first frame over {RUNS} runs: "
+          f"median {median * 1000:.0f} ms, min {min(first_frames) * 1000:.0f} ms, "
+          f"max {max(first_frames) * 1000:.0f} ms (budget {STARTUP_BUDGET_SECONDS * 1000:.0f} ms)")
+
+    failed = False
+    heavy = sorted({m for run in measurements for m in run['heavy_on_import']})
+    if heavy:
+        print(f"FAIL: importing main.py loads {', '.join(heavy)} before the first frame")
+        failed = True
+    if median > STARTUP_BUDGET_SECONDS:
+        print("FAIL: time to first frame is over budget")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
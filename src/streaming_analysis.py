@@ -0,0 +1,316 @@
+"""
+Streaming analysis of the session archive
+
+Reads the session files in chunks of trial rows and keeps only running
+aggregates: correct/total counts per (session, condition, test) while a
+file is read, and per subgroup - once a session is complete - Welford
+mean/variance, win/tie/loss counts and a rank sketch of the paired
+differences. Memory grows with the number of sessions (and distinct
+accuracy values), not with the number of trials, and the numbers match the
+in-memory analysis.
+
+Run from the project root:  python src/streaming_analysis.py [chunk_rows]
+"""
+import glob
+import math
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from analysis_data import SUMMARY_COLUMNS, TRIAL_COLUMNS, TRIAL_DTYPES, detect_schema, read_legacy_file
+from scoring import score_trials
+
+# Trial rows per chunk
+CHUNK_ROWS = 50000
+
+# Exact Wilcoxon p-values like scipy.stats.wilcoxon: up to 50 differences without
+# ties or zeros, up to 13 differences otherwise; the normal approximation above that
+EXACT_WILCOXON_MAX = 50
+EXACT_WILCOXON_TIES_MAX = 13
+
+SUBGROUP_COLUMNS = ['group', 'level', 'n', 'mean_N', 'std_N', 'mean_P', 'std_P', 'mean_diff', 'std_diff',
+                    'median_diff', 'wins_P', 'wins_N', 'ties', 'wilcoxon_stat', 'wilcoxon_p']
+
+
+class RunningStats:
+    """Count, mean and variance in one pass (Welford), mergeable"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other):
+        """Combine with another RunningStats (Chan et al.)"""
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+    def variance(self, ddof=1):
+        return self.m2 / (self.count - ddof) if self.count > ddof else math.nan
+
+    def std(self, ddof=1):
+        return math.sqrt(self.variance(ddof))
+
+
+class RankSketch:
+    """
+    Counts per distinct value
+
+    Accuracies are multiples of 1 / (words per test), so the number of
+    distinct differences stays small and ranks, medians and the signed-rank
+    test come out exactly.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, value):
+        self.counts[value] += 1
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        return self
+
+    def median(self):
+        values = sorted(self.counts)
+        cumulative = np.cumsum([self.counts[v] for v in values])
+        total = cumulative[-1] if len(values) else 0
+        if total == 0:
+            return math.nan
+        # Average of the two middle values (0-based positions)
+        lower = values[int(np.searchsorted(cumulative, (total - 1) // 2 + 1))]
+        upper = values[int(np.searchsorted(cumulative, total // 2 + 1))]
+        return (lower + upper) / 2
+
+    def signed_rank_test(self):
+        """
+        Two-sided Wilcoxon signed-rank test of the sketched differences
+
+        Zero differences are dropped and tied |differences| get mid-ranks,
+        as in scipy.stats.wilcoxon, which also decides between the exact
+        null distribution (of the mid-ranks, over all sign patterns) and the
+        normal approximation with tie correction.
+
+        Returns:
+            (statistic, p_value): min(R+, R-) and its p-value
+        """
+        magnitudes = Counter()
+        positive = Counter()
+        for value, count in self.counts.items():
+            if value != 0:
+                magnitudes[abs(value)] += count
+                if value > 0:
+                    positive[abs(value)] += count
+        n_total = sum(self.counts.values())
+        n = sum(magnitudes.values())
+        if n == 0:
+            return math.nan, math.nan
+
+        # Mid-rank of every distinct |difference|
+        rank_sum_plus = 0.0
+        tie_term = 0
+        doubled_ranks = []
+        below = 0
+        for magnitude in sorted(magnitudes):
+            count = magnitudes[magnitude]
+            mid_rank = below + (count + 1) / 2
+            rank_sum_plus += positive[magnitude] * mid_rank
+            tie_term += count ** 3 - count
+            doubled_ranks += [int(2 * mid_rank)] * count
+            below += count
+        total = n * (n + 1) / 2
+        statistic = min(rank_sum_plus, total - rank_sum_plus)
+
+        untied = tie_term == 0 and n == n_total
+        if n_total <= (EXACT_WILCOXON_MAX if untied else EXACT_WILCOXON_TIES_MAX):
+            # Number of sign patterns per (doubled) rank sum R+
+            ways = np.zeros(sum(doubled_ranks) + 1)
+            ways[0] = 1
+            for rank in doubled_ranks:
+                ways[rank:] = ways[rank:] + ways[:-rank]
+            observed = int(round(2 * rank_sum_plus))
+            less = ways[:observed + 1].sum() / 2 ** n
+            greater = ways[observed:].sum() / 2 ** n
+            p_value = min(1.0, 2 * min(less, greater))
+        else:
+            mean = total / 2
+            sd = math.sqrt(n * (n + 1) * (2 * n + 1) / 24 - tie_term / 48)
+            p_value = 2 * norm.sf(abs(statistic - mean) / sd)
+        return statistic, p_value
+
+
+class SubgroupAggregate:
+    """Running aggregates of the paired accuracies of one subgroup"""
+
+    def __init__(self):
+        self.accuracy_N = RunningStats()
+        self.accuracy_P = RunningStats()
+        self.diff = RunningStats()
+        self.diff_sketch = RankSketch()
+
+    def add(self, accuracy_N, accuracy_P):
+        diff = accuracy_P - accuracy_N
+        self.accuracy_N.add(accuracy_N)
+        self.accuracy_P.add(accuracy_P)
+        self.diff.add(diff)
+        self.diff_sketch.add(diff)
+
+    def row(self):
+        counts = self.diff_sketch.counts
+        statistic, p_value = self.diff_sketch.signed_rank_test()
+        return {
+            'n': self.diff.count,
+            'mean_N': self.accuracy_N.mean, 'std_N': self.accuracy_N.std(),
+            'mean_P': self.accuracy_P.mean, 'std_P': self.accuracy_P.std(),
+            'mean_diff': self.diff.mean, 'std_diff': self.diff.std(),
+            'median_diff': self.diff_sketch.median(),
+            'wins_P': sum(c for v, c in counts.items() if v > 0),
+            'wins_N': sum(c for v, c in counts.items() if v < 0),
+            'ties': counts.get(0.0, 0),
+            'wilcoxon_stat': statistic,
+            'wilcoxon_p': p_value,
+        }
+
+
+def _session_accuracies(counts, session_id, tests):
+    """
+    Accuracy per condition and the attributes of one complete session
+
+    Args:
+        counts: (id, condition, test_id) -> [correct, total, youtube_usage, knows_icelandic]
+        tests: test_id -> condition of this session
+
+    Returns:
+        ({'N': accuracy, 'P': accuracy}, attributes), or (None, None) when
+        the session does not have both conditions
+    """
+    per_condition = {}
+    for test_id, condition in tests.items():
+        correct, total, youtube_usage, knows_icelandic = counts[(session_id, condition, test_id)]
+        summed = per_condition.setdefault(condition, [0, 0])
+        summed[0] += correct
+        summed[1] += total
+    if set(per_condition) != {'N', 'P'}:
+        return None, None
+
+    accuracy = {condition: c / t for condition, (c, t) in per_condition.items()}
+    attributes = {
+        'youtube_usage': youtube_usage,
+        'knows_icelandic': knows_icelandic,
+        'order': tests.get(0, '') + tests.get(1, '') if len(tests) == 2 else None,
+    }
+    return accuracy, attributes
+
+
+def iter_file_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Trial rows of one session file in chunks, in the current layout"""
+    schema = detect_schema(path)
+    if schema == 'current':
+        yield from (chunk[TRIAL_COLUMNS] for chunk in
+                    pd.read_csv(path, dtype=TRIAL_DTYPES, usecols=TRIAL_COLUMNS, chunksize=chunk_rows))
+    elif schema == 'legacy':
+        # Legacy pilot files are one small table each
+        yield read_legacy_file(path)
+    else:
+        print(f"Skipping {path}: unknown file layout")
+
+
+def ingest_file(path, counts, chunk_rows=CHUNK_ROWS, max_edits=0):
+    """
+    Add the counts of one session file to counts, chunk by chunk
+
+    Args:
+        path: Session CSV file
+        counts: (id, condition, test_id) -> [correct, total, youtube_usage, knows_icelandic],
+            updated in place
+        chunk_rows: Trial rows read and scored at a time
+        max_edits: Accept typos within this many edits as correct (0 = exact only)
+
+    Returns:
+        List of (accuracy, attributes) of the file's complete sessions
+        (see _session_accuracies)
+    """
+    file_keys = []
+    for chunk in iter_file_chunks(path, chunk_rows):
+        scored = score_trials(chunk, max_edits=max_edits).dropna(subset=['condition', 'test_id'])
+        grouped = scored.groupby(['id', 'condition', 'test_id'], sort=False).agg(
+            correct=('correct', 'sum'), total=('correct', 'count'),
+            youtube_usage=('youtube_usage', 'first'), knows_icelandic=('knows_icelandic', 'first'))
+        for key, row in zip(grouped.index, grouped.itertuples(index=False)):
+            entry = counts.get(key)
+            if entry is None:
+                counts[key] = [row.correct, row.total, row.youtube_usage, row.knows_icelandic]
+                file_keys.append(key)
+            else:
+                entry[0] += row.correct
+                entry[1] += row.total
+
+    # The file is complete: its sessions' accuracies are final
+    sessions = {}
+    for session_id, condition, test_id in file_keys:
+        sessions.setdefault(session_id, {})[test_id] = condition
+    complete = []
+    for session_id, tests in sessions.items():
+        accuracy, attributes = _session_accuracies(counts, session_id, tests)
+        if accuracy is not None:
+            complete.append((accuracy, attributes))
+    return complete
+
+
+def stream_archive(data_dir="data", chunk_rows=CHUNK_ROWS, max_edits=0,
+                   group_columns=('youtube_usage', 'knows_icelandic', 'order')):
+    """
+    One pass over the archive in chunks, keeping only running aggregates
+
+    Args:
+        data_dir: Directory with the session CSV files
+        chunk_rows: Trial rows read and scored at a time
+        max_edits: Accept typos within this many edits as correct (0 = exact only)
+        group_columns: Session attributes to aggregate subgroups by
+
+    Returns:
+        (session_summary, subgroups): the SUMMARY_COLUMNS frame of the
+        in-memory path and a tidy frame with SUBGROUP_COLUMNS ('All' plus
+        one row per level of every group column)
+    """
+    counts = {}  # (id, condition, test_id) -> [correct, total, youtube_usage, knows_icelandic]
+    subgroups = {('All', 'All'): SubgroupAggregate()}
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        for accuracy, attributes in ingest_file(path, counts, chunk_rows, max_edits):
+            for group in [('All', 'All')] + [(column, attributes[column]) for column in group_columns]:
+                if not pd.isna(group[1]):
+                    subgroups.setdefault(group, SubgroupAggregate()).add(accuracy['N'], accuracy['P'])
+
+    session_summary = pd.DataFrame(
+        [(session_id, condition, int(test_id), c, t, c / t, youtube_usage, knows_icelandic)
+         for (session_id, condition, test_id), (c, t, youtube_usage, knows_icelandic) in counts.items()],
+        columns=SUMMARY_COLUMNS)
+    rows = [{'group': group, 'level': level, **aggregate.row()}
+            for (group, level), aggregate in sorted(subgroups.items(),
+                                                    key=lambda item: (item[0][0] != 'All', item[0][0], str(item[0][1])))]
+    return session_summary, pd.DataFrame(rows, columns=SUBGROUP_COLUMNS)
+
+
+if __name__ == "__main__":
+    import sys
+
+    chunk = int(sys.argv[1]) if len(sys.argv) > 1 else CHUNK_ROWS
+    summary, table = stream_archive(chunk_rows=chunk)
+    print(f"Streamed {summary['id'].nunique()} sessions in chunks of {chunk} trial rows")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
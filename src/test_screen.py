@@ -1,11 +1,12 @@
 import tkinter as tk
-import pandas as pd
-import os
 import random
+from session_registry import find_session_file
+from screen_manager import ScreenManager
 
 
 class TestScreen:
-    def __init__(self, root, word_data, unique_id, personalization_flag=None, completion_callback=None):
+    def __init__(self, root, word_data, unique_id, personalization_flag=None, completion_callback=None,
+                 answer_journal=None, session_path=None, screens=None, start=True):
         """
         Initialize the test screen
 
@@ -15,12 +16,21 @@ class TestScreen:
             unique_id: Unique session identifier
             personalization_flag: True for Personalized, False for Non-personalized
             completion_callback: Function to call when test is completed
+            answer_journal: AnswerJournal (or SQLite session writer) that records every answer change (optional)
+            session_path: Path of the session CSV (optional, looked up in data/ if missing)
+            screens: ScreenManager of the app (optional, one is created on root if missing)
+            start: Show the screen and start the timer right away; with False the
+                widgets are built when the event loop is idle and start() shows them
         """
         self.root = root
         self.word_data = word_data
         self.unique_id = unique_id
         self.personalization_flag = personalization_flag
         self.completion_callback = completion_callback
+        self.answer_journal = answer_journal
+        self.session_path = session_path
+        self.screens = screens or ScreenManager(root)
+        self.test_id = 0
 
         # Create randomized question order
         self.question_indices = list(range(len(self.word_data)))
@@ -34,6 +44,7 @@ class TestScreen:
         # Timer variables
         self.time_remaining = 3 * 60  # 3 minutes in seconds
         self.timer_display = None
+        self.timer_id = None
 
         # UI components
         self.question_cards = []
@@ -45,16 +56,42 @@ class TestScreen:
 
         print(f"First test created with randomized order: {self.question_indices[:5]}...")
 
+        # The widgets are bound to this instance, so a screen left by an earlier one is not reused
+        self.screens.discard(self.screen_name)
+        if start:
+            self.setup_ui()
+        else:
+            self.screens.prepare_later(self.screen_name, self.build_ui)
+
+    @property
+    def screen_name(self):
+        return f'test_{self.test_id}'
+
+    def start(self):
+        """Show the test screen with no answers and a full 3 minutes"""
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+        self.current_question = 0
+        self.answers = {}
+        self.time_remaining = 3 * 60
         self.setup_ui()
 
     def setup_ui(self):
         """Setup the test screen user interface"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.show(self.screen_name, self.build_ui)
+        self.answer_entry.focus()
+
+        # Start with first question
+        self.display_current_question()
+
+        # Start the 3-minute countdown timer
+        self.start_timer()
 
+    def build_ui(self, screen):
+        """Build the test screen widgets"""
         # Main container
-        main_frame = tk.Frame(self.root, bg='white')
+        main_frame = tk.Frame(screen, bg='white')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
         # Timer and question cards in upper left corner
@@ -131,7 +168,6 @@ class TestScreen:
         self.answer_entry = tk.Entry(button_input_frame, font=("Arial", 16), width=25, justify='center')
         self.answer_entry.grid(row=0, column=1, padx=10, pady=5)
         self.answer_entry.bind('<KeyRelease>', self.on_answer_changed)
-        self.answer_entry.focus()
 
         # Next button (right)
         self.next_button = tk.Button(button_input_frame, text="Next", font=("Arial", 12),
@@ -147,12 +183,6 @@ class TestScreen:
                                           command=self.finish_test, width=20, height=2)
         self.finish_test_button.pack()
 
-        # Start with first question
-        self.display_current_question()
-
-        # Start the 3-minute countdown timer
-        self.start_timer()
-
     def start_timer(self):
         """Start the 3-minute countdown timer"""
         self.update_timer()
@@ -177,10 +207,11 @@ class TestScreen:
 
             self.time_remaining -= 1
 
-            # Schedule next update in 1 second
-            self.root.after(1000, self.update_timer)
+            # Schedule next update in 1 second and store the timer ID
+            self.timer_id = self.root.after(1000, self.update_timer)
         else:
             # Time's up!
+            self.timer_id = None
             if self.timer_display:
                 self.timer_display.config(text="00:00", fg='red')
             self.on_timer_finished()
@@ -189,7 +220,7 @@ class TestScreen:
         """Handle when the 3-minute timer reaches zero"""
         print("Test time finished!")
         # Save answers and complete the test
-        self.save_answers_to_csv()
+        self.save_answers()
         if self.completion_callback:
             self.completion_callback(self.answers)
         else:
@@ -198,11 +229,11 @@ class TestScreen:
 
     def show_times_up_screen(self):
         """Show the time's up completion screen"""
-        # Clear the root window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.screens.show('times_up', self.build_times_up_screen)
 
-        completion_frame = tk.Frame(self.root, bg='white')
+    def build_times_up_screen(self, screen):
+        """Build the time's up completion screen"""
+        completion_frame = tk.Frame(screen, bg='white')
         completion_frame.pack(fill=tk.BOTH, expand=True)
 
         completion_label = tk.Label(
@@ -280,6 +311,8 @@ class TestScreen:
         word_id = self.get_current_word_id()
         if word_id is not None:
             self.answers[word_id] = answer
+            if self.answer_journal:
+                self.answer_journal.record(self.test_id, word_id, answer)
             self.update_all_cards()
 
     def previous_question(self):
@@ -300,20 +333,23 @@ class TestScreen:
             self.current_question = question_index
             self.display_current_question()
 
+    def save_answers(self):
+        """Save the answers - a journal flush when a journal is attached, otherwise a CSV rewrite"""
+        if self.answer_journal:
+            self.answer_journal.mark_finished(self.test_id)
+            print(f"✓ {len(self.answers)} answers journaled to {self.answer_journal.journal_path} (Test 1)")
+        else:
+            self.save_answers_to_csv()
+
     def save_answers_to_csv(self):
         """Save the answers to the CSV file for test_id=0 rows only, filling 'none' for unanswered questions"""
-        try:
-            data_dir = "data"
-            if not os.path.exists(data_dir):
-                print("Data directory not found")
-                return
+        import pandas as pd
 
-            csv_files = [f for f in os.listdir(data_dir)
-                        if f.startswith(f"experiment_{self.unique_id}") and f.endswith('.csv')]
+        try:
+            # Use the path handed over by the app; only scan data/ when running standalone
+            latest_csv = self.session_path or find_session_file(self.unique_id)
 
-            if csv_files:
-                csv_files.sort()
-                latest_csv = os.path.join(data_dir, csv_files[-1])
+            if latest_csv:
                 df = pd.read_csv(latest_csv)
 
                 # Ensure word_id columns are the same type (int)
@@ -359,5 +395,9 @@ class TestScreen:
 
     def finish_test(self):
         """Finish the test immediately (for testing purposes)"""
+        # Cancel the pending tick, it would finish the test a second time
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
         self.time_remaining = 0
         self.update_timer()
@@ -0,0 +1,158 @@
+import glob
+import hashlib
+import os
+import pickle
+
+# Bump when the cache layout or the standardization changes
+CACHE_VERSION = 2
+CACHE_SUFFIX = '.wordbank'
+
+
+def cache_path_for(xlsx_path):
+    """Compiled cache file that sits next to a workbook"""
+    return os.path.splitext(xlsx_path)[0] + CACHE_SUFFIX
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# Canonical column -> substrings that identify it in a workbook header
+COLUMN_ALIASES = {
+    'word_id': ('word_id', 'id'),
+    'ice': ('ice', 'island'),
+    'eng': ('eng', 'english'),
+    'dan': ('dan', 'dansk'),
+}
+
+
+def resolve_columns(columns):
+    """
+    Map workbook headers onto the canonical columns in a single pass
+
+    The first header containing one of a canonical column's aliases wins.
+    If neither an Icelandic nor an English column is found, the first two
+    columns are assumed to be Icelandic and English.
+
+    Returns:
+        Dict canonical name -> workbook column (missing columns are left out)
+    """
+    resolved = {}
+    for col in columns:
+        col_str = str(col).lower()
+        for canonical, aliases in COLUMN_ALIASES.items():
+            if canonical not in resolved and any(alias in col_str for alias in aliases):
+                resolved[canonical] = col
+
+    # If we can't find named columns, assume columns by position
+    if 'ice' not in resolved and 'eng' not in resolved and len(columns) >= 2:
+        resolved['ice'] = columns[0]
+        resolved['eng'] = columns[1]
+    return resolved
+
+
+def standardize_word_table(df):
+    """Map a workbook's columns onto the standard (word_id, ice, eng[, dan]) table"""
+    import pandas as pd
+
+    print(f"Columns: {df.columns.tolist()}")
+    resolved = resolve_columns(list(df.columns))
+    print(f"Using columns - word_id: {resolved.get('word_id')}, ice: {resolved.get('ice')}, "
+          f"eng: {resolved.get('eng')}, dan: {resolved.get('dan')}")
+
+    # Whole-column copies; word_id falls back to the 1-based row number
+    result = {
+        'word_id': (df[resolved['word_id']].to_numpy() if 'word_id' in resolved
+                    else pd.RangeIndex(1, len(df) + 1)),
+        'ice': df[resolved['ice']].to_numpy() if 'ice' in resolved else '',
+        'eng': df[resolved['eng']].to_numpy() if 'eng' in resolved else '',
+    }
+    if 'dan' in resolved:
+        result['dan'] = df[resolved['dan']].to_numpy()
+
+    return pd.DataFrame(result, index=pd.RangeIndex(len(df)))
+
+
+def read_cache(xlsx_path):
+    """
+    Read the compiled cache of a workbook if it is still valid
+
+    The cache is valid when the workbook's mtime and size are unchanged, or
+    when they changed but the contents hash is the same (e.g. after a copy).
+
+    Returns:
+        Dict of column lists, or None when the cache is missing or stale
+    """
+    cache_path = cache_path_for(xlsx_path)
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if cache.get('version') != CACHE_VERSION:
+        return None
+
+    stat = os.stat(xlsx_path)
+    if cache['mtime_ns'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+        return cache['columns']
+
+    if cache['sha256'] == file_hash(xlsx_path):
+        # Same contents, only the timestamp moved - refresh it so the hash is skipped next time
+        write_cache(xlsx_path, cache['columns'], cache['sha256'])
+        return cache['columns']
+    return None
+
+
+def write_cache(xlsx_path, columns, sha256=None):
+    """Store the standardized columns of a workbook in its compiled cache"""
+    stat = os.stat(xlsx_path)
+    cache = {
+        'version': CACHE_VERSION,
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': sha256 or file_hash(xlsx_path),
+        'columns': columns
+    }
+    cache_path = cache_path_for(xlsx_path)
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # A read-only word_pairs/ folder just means no cache
+        print(f"Could not write word bank cache {cache_path}: {e}")
+
+
+def load_word_bank(xlsx_path):
+    """
+    Load the standardized word table of a workbook, using the compiled cache when possible
+
+    Args:
+        xlsx_path: Path to a workbook in word_pairs/
+
+    Returns:
+        DataFrame with word_id, ice and eng columns (plus dan when the workbook has Danish)
+    """
+    import pandas as pd
+
+    columns = read_cache(xlsx_path)
+    if columns is not None:
+        print(f"Word bank loaded from cache: {cache_path_for(xlsx_path)}")
+        return pd.DataFrame(columns)
+
+    df = pd.read_excel(xlsx_path)
+    print(f"Excel file loaded successfully! Shape: {df.shape}")
+    result_df = standardize_word_table(df)
+    write_cache(xlsx_path, result_df.to_dict('list'))
+    return result_df
+
+
+if __name__ == "__main__":
+    # Compile the cache for every workbook in word_pairs/
+    for workbook in sorted(glob.glob(os.path.join("word_pairs", "*.xlsx"))):
+        words = load_word_bank(workbook)
+        print(f"{workbook}: {len(words)} word pairs -> {cache_path_for(workbook)}")